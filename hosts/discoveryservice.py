@@ -0,0 +1,167 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: Host discovery queries submitted to many VxRail Managers at once and polled together
+
+import collections
+from utils.concurrency import run_concurrently
+from utils.poller import Poller
+from utils.utils import HOST_DISCOVERY_POLL_DEADLINE, IN_PROGRESS_STATUSES
+
+__author__ = 'virtis'
+
+HOST_DISCOVERY_QUERY = "UNMANAGED_HOSTS_IN_HCIMGR"
+USEABLE_HOST_STATUS = 'UNASSIGNED_USEABLE'
+DISCOVERY_MAX_WORKERS = 16
+
+
+class HostDiscovery:
+    __slots__ = ('serial_no', 'ssh_thumbprint', 'nic_speeds', 'is_primary')
+
+    # nic_speeds is physical nic device name -> speed, the only part of physicalNics in use, so pools of hundreds
+    # of hosts do not keep the full nic descriptions around
+    def __init__(self, serial_no, ssh_thumbprint, nic_speeds, is_primary):
+        self.serial_no = serial_no
+        self.ssh_thumbprint = ssh_thumbprint
+        self.nic_speeds = nic_speeds
+        self.is_primary = is_primary
+
+    # element of the UNMANAGED_HOSTS_IN_HCIMGR query result
+    @classmethod
+    def from_element(cls, element):
+        return cls(element['serialNumber'], element['sshThumbprint'],
+                   {nic['deviceName']: nic['speed'] for nic in element['physicalNics']}, element['isPrimary'])
+
+
+class ManagerDiscovery:
+    # Outcome of the discovery query of one VxRail Manager. error is None on success.
+    def __init__(self, vxrm_fqdn):
+        self.vxrm_fqdn = vxrm_fqdn
+        self.hosts = []
+        self.error = None
+        self.query_url = None
+
+
+class HostCatalogue:
+    # Useable hosts of every VxRail Manager, indexed by serial number. A serial number reported by more than
+    # one VxRail Manager stays with the first one. All the lookups used while
+    # selecting hosts and patching thumbprints are served from indexes built here, once per discovery.
+    def __init__(self):
+        self.managers = collections.OrderedDict()
+        self.hosts_by_serial = collections.OrderedDict()
+        # serial number -> nic device name -> speed
+        self.nic_speeds_by_serial = {}
+        # Primary host (the node running the VxRail Manager) of the last VxRail Manager having one, None if there
+        # is none
+        self.primary = None
+
+    def add(self, discovery):
+        self.managers[discovery.vxrm_fqdn] = discovery
+        for host in discovery.hosts:
+            if host.is_primary:
+                self.primary = host
+            if host.serial_no in self.hosts_by_serial:
+                continue
+            self.hosts_by_serial[host.serial_no] = host
+            self.nic_speeds_by_serial[host.serial_no] = host.nic_speeds
+
+    def get(self, serial_no):
+        return self.hosts_by_serial.get(serial_no)
+
+    # Serial numbers in discovery order
+    def serial_numbers(self):
+        return list(self.hosts_by_serial.keys())
+
+    # serial number -> nic device name -> speed, the index itself, not to be modified
+    def nic_speed_table(self):
+        return self.nic_speeds_by_serial
+
+    def __contains__(self, serial_no):
+        return serial_no in self.hosts_by_serial
+
+    def __iter__(self):
+        return iter(self.hosts_by_serial.values())
+
+    def __len__(self):
+        return len(self.hosts_by_serial)
+
+
+class HostDiscoveryService:
+    # utils is the Utils instance used for the REST calls
+    def __init__(self, utils, deadline=HOST_DISCOVERY_POLL_DEADLINE):
+        self.utils = utils
+        self.hostname = utils.hostname
+        self.deadline = deadline
+
+    # managers: list of (VxRail Manager fqdn, ssl thumbprint). Every query is submitted at once, then all the
+    # unfinished ones are polled together with one backoff until they are finished or the deadline passes.
+    # Failures are printed and recorded on the ManagerDiscovery of the VxRail Manager, they do not stop the
+    # discovery of the others. Returns the HostCatalogue.
+    def discover(self, managers):
+        discoveries = collections.OrderedDict((fqdn, ManagerDiscovery(fqdn)) for fqdn, _ in managers)
+        submissions = run_concurrently({fqdn: self.__submit_call(discoveries[fqdn], thumbprint)
+                                        for fqdn, thumbprint in managers}, DISCOVERY_MAX_WORKERS)
+        pending = {}
+        for fqdn, (_, error) in submissions.items():
+            if error is None:
+                pending[fqdn] = discoveries[fqdn]
+            else:
+                # Utils already printed why it exited
+                if not isinstance(error, SystemExit):
+                    self.utils.printRed("Host discovery query of {} could not be submitted: {}".format(fqdn, error))
+                discoveries[fqdn].error = "Host discovery query could not be submitted"
+
+        if pending:
+            poller = Poller(deadline=self.deadline)
+            remaining = poller.poll(lambda: self.__poll_pending(pending), lambda still_pending: not still_pending)
+            if remaining is None:
+                for discovery in pending.values():
+                    self.utils.printRed('Host discovery by {} did not complete within {} minutes'
+                                        .format(discovery.vxrm_fqdn, self.deadline // 60))
+                    discovery.error = "Host discovery did not complete within {} minutes".format(self.deadline // 60)
+
+        catalogue = HostCatalogue()
+        for discovery in discoveries.values():
+            catalogue.add(discovery)
+        return catalogue
+
+    def __submit_call(self, discovery, ssl_thumbprint):
+        def submit():
+            payload = {
+                "name": HOST_DISCOVERY_QUERY,
+                "arguments": {
+                    "hciManagerFqdn": discovery.vxrm_fqdn,
+                    "hciManagerSslThumbprint": ssl_thumbprint
+                },
+                "description": "Return all the unmanaged hosts discovered by HCI manager"
+            }
+            response = self.utils.post_request_for_host_discovery(payload,
+                                                                  'https://' + self.hostname + '/v1/hosts/queries')
+            discovery.query_url = 'https://' + self.hostname + response.headers['Location']
+        return submit
+
+    # One GET for every pending query, finished ones are recorded and removed. Returns what is still pending
+    def __poll_pending(self, pending):
+        responses = run_concurrently({fqdn: self.__get_call(discovery.query_url)
+                                      for fqdn, discovery in pending.items()}, DISCOVERY_MAX_WORKERS)
+        for fqdn, (response, error) in responses.items():
+            discovery = pending[fqdn]
+            # Error bodies of a failed GET are returned as they are, without queryInfo
+            if error is None and not (isinstance(response, dict) and 'queryInfo' in response):
+                error = "unexpected response {}".format(response)
+            if error is None and response['queryInfo']['status'] in IN_PROGRESS_STATUSES:
+                continue
+            del pending[fqdn]
+            if error is not None:
+                # Utils already printed why it exited
+                if not isinstance(error, SystemExit):
+                    self.utils.printRed("Host discovery query of {} failed: {}".format(fqdn, error))
+                discovery.error = "Host discovery query failed"
+            elif response['queryInfo']['status'] == 'COMPLETED':
+                discovery.hosts = [HostDiscovery.from_element(element) for element in response['result']['elements']
+                                   if element['status'] == USEABLE_HOST_STATUS]
+            else:
+                self.utils.print_errors(response)
+                discovery.error = "Host discovery query ended with status {}".format(response['queryInfo']['status'])
+        return pending
+
+    def __get_call(self, url):
+        return lambda: self.utils.get_request_for_host_discovery(url)
@@ -1,8 +1,9 @@
 # Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
 # Description: Prepare Hosts Spec
 
-import time
-from typing import Dict, Any
+from hosts.discoveryservice import HostDiscoveryService
+from hosts.nicmatrix import NicMatrix
+from network.networkautomator import MIN_SPEED_REQUIRED_IN_MB
 from utils.utils import Utils
 
 __author__ = 'virtis'
@@ -14,54 +15,36 @@ class HostsAutomator:
         self.hostname = args[0]
         self.two_line_separator = ['', '']
         self.password_map = {}
+        self.discovery = HostDiscoveryService(self.utils)
 
     def discover_hosts(self, vxrm_fqdn, vxrm_ssl_thumbprint):
         self.utils.printGreen("Discovering hosts by VxRail Manager...")
         print(*self.two_line_separator, sep='\n')
-        post_url = 'https://' + self.hostname + '/v1/hosts/queries'
-        payload = {
-            "name": "UNMANAGED_HOSTS_IN_HCIMGR",
-            "arguments": {
-                "hciManagerFqdn": vxrm_fqdn,
-                "hciManagerSslThumbprint": vxrm_ssl_thumbprint
-            },
-            "description": "Return all the unmanaged hosts discovered by HCI manager"
-        }
-        response = self.utils.post_request_for_host_discovery(payload, post_url)
-
-        time.sleep(10)
-        get_url = 'https://' + self.hostname + response.headers['Location']
-        host_discovery_response = self.utils.poll_on_queries_for_host_discovery(get_url)
-
-        discovered_hosts = []
-        for element in host_discovery_response['elements']:
-            if element['status'] == 'UNASSIGNED_USEABLE':
-                discovered_hosts.append(
-                    HostDiscovery(element['serialNumber'], element['sshThumbprint'], element['physicalNics'],
-                                  element['isPrimary']))
-
-        return discovered_hosts
+        catalogue = self.discovery.discover([(vxrm_fqdn, vxrm_ssl_thumbprint)])
+        if catalogue.managers[vxrm_fqdn].error is not None:
+            exit(1)
+        return catalogue
 
+    # discovered_hosts is the HostCatalogue returned by discover_hosts
     def input_hosts_details(self, discovered_hosts, vsan_storage):
         min_nodes_req = 3
-        serialno_to_thumbprint = self.get_serialno_to_thumbprint_mapping(discovered_hosts)
         primary_node_serialno = self.get_primary_node_serialno(discovered_hosts)
-        primary_node_thumbprint = serialno_to_thumbprint[primary_node_serialno]
 
-        if len(serialno_to_thumbprint.keys()) < min_nodes_req:
+        if len(discovered_hosts) < min_nodes_req:
             print(*self.two_line_separator, sep='\n')
             self.utils.printRed("Hosts discovered by the VxRail Manager are:")
-            self.utils.printRed("{}".format(serialno_to_thumbprint.keys()))
+            self.utils.printRed("{}".format(discovered_hosts.serial_numbers()))
             self.utils.printRed("Minimum {} nodes are required for initial configuration".format(min_nodes_req))
             exit(1)
 
-        # Deleting primary node from dict to display other nodes only to the user
-        del serialno_to_thumbprint[primary_node_serialno]
+        # Only the other nodes are displayed to the user, the options index this list
+        other_serial_nos = [serial_no for serial_no in discovered_hosts.serial_numbers()
+                            if serial_no != primary_node_serialno]
 
         self.utils.printYellow("** By Default primary node gets selected. Please select atleast two other nodes.")
         self.utils.printCyan("Hosts discovered by the VxRail Manager are:")
         self.utils.printBold("VxRail Manager is detected on primary node : {}".format(primary_node_serialno))
-        for i, key in enumerate(serialno_to_thumbprint.keys()):
+        for i, key in enumerate(other_serial_nos):
             self.utils.printBold("{}) {}".format(i + 1, key))
 
         while True:
@@ -74,7 +57,7 @@ class HostsAutomator:
                                         "initial configuration")
                     var = False
                 if var:
-                    if int(host_option.strip()) not in range(1, len(serialno_to_thumbprint) + 1):
+                    if int(host_option.strip()) not in range(1, len(other_serial_nos) + 1):
                         self.utils.printRed("Please enter valid options for selecting hosts")
                         var = False
             if var and len(host_options) < (min_nodes_req - 1):
@@ -86,7 +69,7 @@ class HostsAutomator:
 
         selected_hosts_serial_no = [primary_node_serialno]
         for index, element in enumerate(host_options):
-            selected_hosts_serial_no.append(list(serialno_to_thumbprint.keys())[int(element) - 1])
+            selected_hosts_serial_no.append(other_serial_nos[int(element) - 1])
 
         print(*self.two_line_separator, sep='\n')
 
@@ -111,41 +94,39 @@ class HostsAutomator:
 
         print(*self.two_line_separator, sep='\n')
 
-        # Adding primary node back to the dict
-        serialno_to_thumbprint[primary_node_serialno] = primary_node_thumbprint
-
         hosts_spec = []
         if option == "1":
             password = self.utils.handle_password_input("Enter root password for hosts:")
             print(*self.two_line_separator, sep='\n')
             for host_fqdn in fqdn_to_serialno.keys():
                 hosts_spec.append(self.to_hosts_spec_obj(host_fqdn, password, fqdn_to_serialno[host_fqdn],
-                                                         serialno_to_thumbprint[fqdn_to_serialno[host_fqdn]]))
+                                                         discovered_hosts.get(fqdn_to_serialno[host_fqdn])
+                                                         .ssh_thumbprint))
         else:
             for host_fqdn in fqdn_to_serialno.keys():
                 password = self.utils.handle_password_input("Enter root password for host {}:".format(host_fqdn))
                 print(*self.two_line_separator, sep='\n')
                 hosts_spec.append(self.to_hosts_spec_obj(host_fqdn, password, fqdn_to_serialno[host_fqdn],
-                                                         serialno_to_thumbprint[fqdn_to_serialno[host_fqdn]]))
+                                                         discovered_hosts.get(fqdn_to_serialno[host_fqdn])
+                                                         .ssh_thumbprint))
         return hosts_spec
 
-    def get_physical_nics(self, discovered_hosts):
-        nics: Dict[Any, Any] = {}
-        for nic in discovered_hosts[0].physical_nics:
-            nics[nic['deviceName']] = nic['speed']
+    # Physical nic device name -> speed for the nics all the selected hosts have, the lowest speed among the
+    # hosts, a dict the caller can modify. The vmnics having min_speed on some of the hosts only are printed,
+    # they are left out of the vds choices here rather than failing in the validation of the spec.
+    def get_physical_nics(self, discovered_hosts, serial_nos, min_speed=MIN_SPEED_REQUIRED_IN_MB):
+        matrix = NicMatrix(serial_nos, discovered_hosts.nic_speed_table())
+        nics, mismatches = matrix.analyse(min_speed)
+        if mismatches:
+            self.utils.printYellow("NICs with speed >={}MB on only some of the selected hosts, they can not be used:"
+                                   .format(min_speed))
+            for mismatch in mismatches:
+                self.utils.printYellow(" {}".format(mismatch))
+            print(*self.two_line_separator, sep='\n')
         return nics
 
-    def get_serialno_to_thumbprint_mapping(self, discovered_hosts):
-        serialno_to_thumbprint = {}
-        for host in discovered_hosts:
-            serialno_to_thumbprint[host.serial_no] = host.ssh_thumbprint
-        return serialno_to_thumbprint
-
     def get_primary_node_serialno(self, discovered_hosts):
-        primary_node = None
-        for host in discovered_hosts:
-            if host.is_primary:
-                primary_node = host.serial_no
+        primary_node = None if discovered_hosts.primary is None else discovered_hosts.primary.serial_no
         if primary_node is None:
             self.utils.printRed("Primary node not found on which VxRail Manager would get discovered")
             self.utils.printRed("Please check on the nodes and VxRail Manager UI 192.168.10.200 is up")
@@ -162,10 +143,3 @@ class HostsAutomator:
             "serialNumber": serial_no
         }
 
-
-class HostDiscovery:
-    def __init__(self, serial_no, ssh_thumbprint, physical_nics, is_primary):
-        self.serial_no = serial_no
-        self.ssh_thumbprint = ssh_thumbprint
-        self.physical_nics = physical_nics
-        self.is_primary = is_primary
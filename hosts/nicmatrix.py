@@ -0,0 +1,49 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: Physical nic speeds of the selected hosts side by side
+
+__author__ = 'virtis'
+
+
+class NicMismatch:
+    __slots__ = ('vmnic', 'speeds')
+
+    # speeds is serial number -> speed of the vmnic on that host, None if the host does not have it
+    def __init__(self, vmnic, speeds):
+        self.vmnic = vmnic
+        self.speeds = speeds
+
+    def __str__(self):
+        return "{}: {}".format(self.vmnic, ", ".join(
+            "{} {}".format(serial_no, "missing" if speed is None else "{}MB".format(speed))
+            for serial_no, speed in self.speeds.items()))
+
+
+class NicMatrix:
+    # One row per vmnic found on any of the hosts, one column per host in the order of serial_nos. A cell is
+    # the speed of the vmnic on the host, None if the host does not have it.
+    # nic_speed_table is serial number -> vmnic -> speed, see HostCatalogue.nic_speed_table
+    def __init__(self, serial_nos, nic_speed_table):
+        self.serial_nos = list(serial_nos)
+        self.rows = {}
+        for column, serial_no in enumerate(self.serial_nos):
+            for vmnic, speed in nic_speed_table[serial_no].items():
+                row = self.rows.get(vmnic)
+                if row is None:
+                    row = self.rows[vmnic] = [None] * len(self.serial_nos)
+                row[column] = speed
+
+    # One pass over the rows. Returns (nics, mismatches):
+    # nics is vmnic -> lowest speed across the hosts, for the vmnics every host has, so a vmnic slower than
+    # min_speed on one host is seen as slower than min_speed
+    # mismatches lists the vmnics having min_speed on some of the hosts only, they can not be used for a vds
+    # spanning all of them
+    def analyse(self, min_speed):
+        nics = {}
+        mismatches = []
+        for vmnic, row in self.rows.items():
+            usable = sum(1 for speed in row if speed is not None and speed >= min_speed)
+            if 0 < usable < len(row):
+                mismatches.append(NicMismatch(vmnic, dict(zip(self.serial_nos, row))))
+            if None not in row:
+                nics[vmnic] = min(row)
+        return nics, mismatches
@@ -1,6 +1,5 @@
 # Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
 # Description: Prepare Network Spec - DVS Specs (Single/Multi DVS)
-import json
 
 from utils.utils import Utils
 
@@ -17,9 +16,9 @@ class NetworkAutomator:
         self.two_line_separator = ['', '']
 
     def prepare_dvs_info(self, physical_nics, nic_profile, input_mgmt_pg_name=None, input_vsan_pg_name=None,
-                         input_vmotion_pg_name=None, pg_types_to_vmnics=None, pg_type_to_active_uplinks=None,
+                         input_vmotion_pg_name=None, vds_topology=None, pg_type_to_active_uplinks=None,
                          cluster_name=None, vsan_storage=None, input_vm_management_pg_name=None,
-                         dvpg_is_on=False, pg_types_to_mtu=None, vds_mtu=None, is_step_by_step=False, is_mtu_supported=False):
+                         dvpg_is_on=False, vds_mtu=None, is_step_by_step=False, is_mtu_supported=False):
         unsupported_vmnics_list = []
         # Creating list of NICs from discovered hosts response having speed < 10000MB
         for vmnic, speed in physical_nics.items():
@@ -41,14 +40,20 @@ class NetworkAutomator:
                                                                                      sorted_physical_nics)
         elif nic_profile == 'ADVANCED_VXRAIL_SUPPLIED_VDS':
             nics_used_for_system_vds = []
-            for item in pg_types_to_vmnics.values():
-                nics_used_for_system_vds.extend(list(set(item)))
+            for system_vds in vds_topology:
+                nics_used_for_system_vds.extend(list(set(system_vds.vmnics)))
             # Check for Advanced nicprofile from VxRail Json -> if NICs passed in VxRail Json
             # contains NICs having speed < 10000MB
             if any(item in nics_used_for_system_vds for item in unsupported_vmnics_list):
                 self.utils.printRed("Input VxRail JSON contains NICs from {} which do not have speed >={}MB"
                                     .format(unsupported_vmnics_list, MIN_SPEED_REQUIRED_IN_MB))
                 exit(1)
+            # physical_nics only has the NICs present on all the selected hosts
+            missing_vmnics = sorted(set(nics_used_for_system_vds) - set(sorted_physical_nics_dict))
+            if missing_vmnics:
+                self.utils.printRed("Input VxRail JSON contains NICs {} which are not present on all the selected hosts"
+                                    .format(missing_vmnics))
+                exit(1)
 
         for nic in nics_used_for_system_vds:
             del sorted_physical_nics_dict[nic]
@@ -66,7 +71,7 @@ class NetworkAutomator:
 
         is_multisystem_vds = False
         if nic_profile == 'ADVANCED_VXRAIL_SUPPLIED_VDS':
-            if len(pg_types_to_vmnics) > 1:
+            if len(vds_topology) > 1:
                 is_multisystem_vds = True
 
         if dvs_selection == "1":
@@ -81,13 +86,13 @@ class NetworkAutomator:
                                                        host_discovery_pg_name, vm_management_pg_name, mtu)
             else:
                 system_dvs_to_pgs, pg_names_to_transport_types, vds_to_usedbynsxt_flag = \
-                    self.input_multisystem_dvs_info(dvs_selection, pg_types_to_vmnics, input_mgmt_pg_name,
+                    self.input_multisystem_dvs_info(dvs_selection, vds_topology, input_mgmt_pg_name,
                                                     input_vsan_pg_name, input_vmotion_pg_name, cluster_name,
                                                     vsan_storage, input_vm_management_pg_name)
                 dvs_payload = self.prepare_dvs_payload_for_advanced_profile_multisystem(system_dvs_to_pgs,
                                                                                         pg_names_to_transport_types,
                                                                                         vds_to_usedbynsxt_flag,
-                                                                                        pg_type_to_active_uplinks, pg_types_to_mtu)
+                                                                                        pg_type_to_active_uplinks, vds_topology)
         elif dvs_selection == "2":
             if not is_multisystem_vds:
                 system_dvs_name, mgmt_pg_name, vsan_pg_name, vmotion_pg_name, system_vm_pg_name, \
@@ -103,7 +108,7 @@ class NetworkAutomator:
                                                        host_discovery_pg_name, vm_management_pg_name, mtu, vmnics)
             else:
                 system_dvs_to_pgs, pg_names_to_transport_types, vds_to_usedbynsxt_flag = \
-                    self.input_multisystem_dvs_info(dvs_selection, pg_types_to_vmnics, input_mgmt_pg_name,
+                    self.input_multisystem_dvs_info(dvs_selection, vds_topology, input_mgmt_pg_name,
                                                     input_vsan_pg_name, input_vmotion_pg_name, cluster_name,
                                                     vsan_storage, input_vm_management_pg_name)
                 vds_portgroups_list = []
@@ -115,7 +120,7 @@ class NetworkAutomator:
                                                                                         pg_names_to_transport_types,
                                                                                         vds_to_usedbynsxt_flag,
                                                                                         pg_type_to_active_uplinks,
-                                                                                        pg_types_to_mtu,
+                                                                                        vds_topology,
                                                                                         vmnics)
         return dvs_payload, vmnics
 
@@ -179,7 +184,7 @@ class NetworkAutomator:
         return dvsSpecs
 
     def prepare_dvs_payload_for_advanced_profile_multisystem(self, system_dvs_to_pgs, pg_names_to_transport_types,
-                                                             vds_to_usedbynsxt_flag, pg_type_to_active_uplinks, pg_types_to_mtu=None,
+                                                             vds_to_usedbynsxt_flag, pg_type_to_active_uplinks, vds_topology=None,
                                                              vmnics=None):
         dvsSpecs = []
         for (key, value) in system_dvs_to_pgs.items():
@@ -199,15 +204,8 @@ class NetworkAutomator:
                 else:
                     activeUplinks = pg_type_to_active_uplinks[pg_names_to_transport_types[pg]]
                     portgroups.append(self.to_portgroup_obj_advanced(pg, type, activeUplinks))
-            # Eg: pg_types_to_mtu = {'["MANAGEMENT", "VXRAILDISCOVERY", "VXRAILSYSTEMVM"]': 3333, '["VSAN", "VMOTION"]': 3333}
-            if pg_types_to_mtu:
-                for pg_types in pg_types_to_mtu.keys():
-                    for pg_type in json.loads(pg_types):
-                        if pg_type in vds_pg_types:
-                            mtu = pg_types_to_mtu[pg_types]
-                            break
-                    if mtu:
-                        break
+            if vds_topology:
+                mtu = vds_topology.mtu_for(vds_pg_types)
             dvsSpecs.append(self.to_system_dvs_obj(key, portgroups, mtu,
                                                    False if vmnics is not None else vds_to_usedbynsxt_flag[key]))
         if vmnics:
@@ -313,15 +311,14 @@ class NetworkAutomator:
                 self.utils.printRed("{} type PG name should start with prefix '{}'".format(pg_type, prefix))
         return pg_name
 
-    def input_multisystem_dvs_info(self, dvs_selection, pg_types_to_vmnics, input_mgmt_pg_name=None,
+    def input_multisystem_dvs_info(self, dvs_selection, vds_topology, input_mgmt_pg_name=None,
                                    input_vsan_pg_name=None, input_vmotion_pg_name=None, cluster_name=None,
                                    vsan_storage=None, input_vm_management_pg_name=None):
         while True:
             system_dvs_to_pgs = {}
             pg_names_to_transport_types = {}
             index = 1
-            for pg_types in pg_types_to_vmnics.keys():
-                pg_types_list = json.loads(pg_types)
+            for system_vds in vds_topology:
                 print()
                 system_dvs_name = self.utils.valid_input(
                     "\033[1m Enter DVS name for System DVS {}: \033[0m".format(index),
@@ -329,7 +326,7 @@ class NetworkAutomator:
                 index = index + 1
                 print()
                 portgroups = []
-                for pg_type in pg_types_list:
+                for pg_type in system_vds.pg_types:
                     if pg_type == 'MANAGEMENT':
                         mgmt_pg_name = self.input_pg_name_and_check_prefix("MANAGEMENT", "Management Network") \
                             if input_mgmt_pg_name is None else input_mgmt_pg_name
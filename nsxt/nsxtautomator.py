@@ -4,6 +4,7 @@
 import ipaddress
 import re
 
+from utils.iputils import ip_range_in_network, parse_ip_ranges
 from utils.utils import Utils
 import sys
 
@@ -93,12 +94,8 @@ class NsxtAutomator:
         return res
 
     def ip_pool_ranges_validation(self, inputstr, cidr):
-        ip_ranges = [x.strip() for x in inputstr.split(',')]
-        for ip_range in ip_ranges:
-            ips = ip_range.split('-')
-            ip1 = int(ipaddress.IPv4Address(ips[0].strip()))
-            ip2 = int(ipaddress.IPv4Address(ips[1].strip()))
-            if ipaddress.ip_address(ip1) and ipaddress.ip_address(ip2) not in ipaddress.ip_network(cidr):
+        for ip1, ip2 in parse_ip_ranges(inputstr):
+            if not ip_range_in_network(ip1, ip2, cidr):
                 self.utils.printRed("IP address pool range ips are not in the same network {}".format(cidr))
                 return False
         return True
@@ -0,0 +1,45 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: Tests of the version parsing and nearest-lower version lookup
+
+import unittest
+from utils.versionindex import VersionIndex, parse_version
+
+__author__ = 'virtis'
+
+
+class ParseVersionTest(unittest.TestCase):
+    def test_build_number_is_ignored(self):
+        self.assertEqual(parse_version("7.0.410-26262"), (7, 0, 410))
+
+    def test_trailing_zeros_compare_equal(self):
+        self.assertEqual(parse_version("7.0"), parse_version("7.0.0"))
+        self.assertEqual(parse_version("7"), parse_version("7.0.0"))
+        self.assertEqual(parse_version("0.0"), (0,))
+
+    def test_numeric_order(self):
+        self.assertLess(parse_version("7.0.999"), parse_version("7.0.1000"))
+        self.assertLess(parse_version("7.0.1000"), parse_version("7.1.0"))
+        self.assertLess(parse_version("7.0"), parse_version("7.0.1"))
+
+
+class VersionIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = VersionIndex([("7.0.0", "a"), ("7.0.241", "b"), ("8.0.100", "c")])
+
+    # "7.0" is the same version as the "7.0.0" entry, not one below all of them
+    def test_floor_of_shorter_equal_version(self):
+        self.assertEqual(self.index.floor("7.0"), "a")
+
+    def test_floor(self):
+        self.assertEqual(self.index.floor("7.0.240"), "a")
+        self.assertEqual(self.index.floor("7.0.241-1234"), "b")
+        self.assertEqual(self.index.floor("9.0"), "c")
+        self.assertIsNone(self.index.floor("6.9.999"))
+
+    def test_lowest(self):
+        self.assertEqual(self.index.lowest(), "a")
+        self.assertIsNone(VersionIndex([]).lowest())
+
+
+if __name__ == '__main__':
+    unittest.main()
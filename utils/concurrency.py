@@ -0,0 +1,40 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: Run independent blocking calls (REST, DNS, sockets) concurrently on an asyncio loop
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+__author__ = 'virtis'
+
+DEFAULT_MAX_WORKERS = 8
+
+
+# Runs every zero-argument callable in calls (dict of name -> callable) concurrently and waits for all of them.
+# Returns dict of name -> (result, error). error is None on success, otherwise the exception raised by the
+# call; SystemExit is captured as well since Utils exits on REST failures.
+def run_concurrently(calls, max_workers=DEFAULT_MAX_WORKERS):
+    if not calls:
+        return {}
+    loop = asyncio.new_event_loop()
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(calls)))
+    try:
+        return loop.run_until_complete(_gather(loop, executor, calls))
+    finally:
+        executor.shutdown(wait=True)
+        loop.close()
+
+
+async def _gather(loop, executor, calls):
+    names = list(calls.keys())
+    futures = [loop.run_in_executor(executor, _capture, calls[name]) for name in names]
+    outcomes = await asyncio.gather(*futures)
+    return dict(zip(names, outcomes))
+
+
+def _capture(call):
+    try:
+        return call(), None
+    except KeyboardInterrupt:
+        raise
+    except (Exception, SystemExit) as e:
+        return None, e
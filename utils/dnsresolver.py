@@ -0,0 +1,100 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: In-process forward/reverse DNS resolution with a TTL cache shared by the whole run
+
+import socket
+import threading
+import time
+from utils.concurrency import run_concurrently
+
+__author__ = 'virtis'
+
+DEFAULT_DNS_TTL_SECONDS = 5 * 60
+DNS_MAX_WORKERS = 16
+
+_shared_resolver = None
+
+
+class DnsResolver:
+    def __init__(self, ttl=DEFAULT_DNS_TTL_SECONDS):
+        self.ttl = ttl
+        # name -> (value, expires_at). Failed lookups are not cached so a corrected DNS record is picked up
+        self.forward_cache = {}
+        self.reverse_cache = {}
+        self.lock = threading.Lock()
+
+    # FQDN -> IPv4 address, None if it does not resolve
+    def resolve_ip(self, fqdn):
+        return self.__lookup(self.forward_cache, fqdn.lower(), self.__query_ip)
+
+    # IPv4 address -> FQDN, None if there is no PTR record
+    def resolve_fqdn(self, ip):
+        return self.__lookup(self.reverse_cache, ip, self.__query_fqdn)
+
+    # Resolves all FQDNs (forward) and IPs (reverse) concurrently in one pass.
+    # Returns (fqdn -> ip, ip -> fqdn), unresolved names map to None.
+    def resolve_many(self, fqdns=(), ips=()):
+        calls = {}
+        for fqdn in set(fqdns):
+            calls[('fqdn', fqdn)] = lambda fqdn=fqdn: self.resolve_ip(fqdn)
+        for ip in set(ips):
+            calls[('ip', ip)] = lambda ip=ip: self.resolve_fqdn(ip)
+        fqdn_to_ip = {}
+        ip_to_fqdn = {}
+        for (kind, name), (value, error) in run_concurrently(calls, DNS_MAX_WORKERS).items():
+            if kind == 'fqdn':
+                fqdn_to_ip[name] = value
+            else:
+                ip_to_fqdn[name] = value
+        return fqdn_to_ip, ip_to_fqdn
+
+    # Unexpired cache entries as (fqdn -> ip, ip -> fqdn), eg. to hand them over to worker processes
+    def export(self):
+        now = time.time()
+        with self.lock:
+            forward = {k: v for k, (v, expires_at) in self.forward_cache.items() if expires_at > now}
+            reverse = {k: v for k, (v, expires_at) in self.reverse_cache.items() if expires_at > now}
+        return forward, reverse
+
+    # Adds lookups done elsewhere (see export) to the cache with a fresh ttl
+    def seed(self, forward, reverse):
+        expires_at = time.time() + self.ttl
+        with self.lock:
+            for fqdn, ip in forward.items():
+                self.forward_cache[fqdn.lower()] = (ip, expires_at)
+            for ip, fqdn in reverse.items():
+                self.reverse_cache[ip] = (fqdn, expires_at)
+
+    def __lookup(self, cache, key, query):
+        now = time.time()
+        with self.lock:
+            if key in cache:
+                value, expires_at = cache[key]
+                if expires_at > now:
+                    return value
+                # Expired entries are evicted on access
+                del cache[key]
+        value = query(key)
+        if value is not None:
+            with self.lock:
+                cache[key] = (value, now + self.ttl)
+        return value
+
+    def __query_ip(self, fqdn):
+        try:
+            return socket.gethostbyname(fqdn)
+        except (socket.error, UnicodeError):
+            return None
+
+    def __query_fqdn(self, ip):
+        try:
+            fqdn = socket.gethostbyaddr(ip)[0]
+        except (socket.error, UnicodeError):
+            return None
+        return fqdn[0:-1] if fqdn.endswith(".") else fqdn
+
+
+def get_shared_resolver():
+    global _shared_resolver
+    if _shared_resolver is None:
+        _shared_resolver = DnsResolver()
+    return _shared_resolver
@@ -0,0 +1,147 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: In-process SSL certificate and SSH host key fingerprint collection
+
+import base64
+import hashlib
+import os
+import socket
+import ssl
+import struct
+from utils.concurrency import run_concurrently
+
+__author__ = 'virtis'
+
+DEFAULT_FINGERPRINT_TIMEOUT_SECONDS = 10
+SSH_CLIENT_VERSION = b'SSH-2.0-WorkflowOptimization_1.0'
+
+SSH_MSG_KEXINIT = 20
+SSH_MSG_KEXDH_INIT = 30
+SSH_MSG_KEXDH_REPLY = 31
+
+# Only classic DH group14 is offered, it needs nothing beyond modular exponentiation and every OpenSSH
+# server still enables it. The key exchange is never completed, the server host key is in the first reply.
+SSH_KEX_ALGORITHMS = 'diffie-hellman-group14-sha256,diffie-hellman-group14-sha1'
+SSH_HOST_KEY_ALGORITHMS = 'rsa-sha2-512,rsa-sha2-256,ssh-rsa'
+SSH_CIPHERS = 'aes128-ctr,aes192-ctr,aes256-ctr,aes128-gcm@openssh.com,aes256-gcm@openssh.com'
+SSH_MACS = 'hmac-sha2-256,hmac-sha2-512,hmac-sha1'
+
+# RFC 3526 2048-bit MODP group (group14), generator 2
+DH_GROUP14_PRIME = int(
+    'FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74020BBEA63B139B22514A08798E3404DD'
+    'EF9519B3CD3A431B302B0A6DF25F14374FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7ED'
+    'EE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3DC2007CB8A163BF0598DA48361C55D39A69163FA8FD24CF5F'
+    '83655D23DCA3AD961C62F356208552BB9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3B'
+    'E39E772C180E86039B2783A2EC07A28FB5C55DF06F4C52C9DE2BCBF6955817183995497CEA956AE515D2261898FA0510'
+    '15728E5A8AACAA68FFFFFFFFFFFFFFFF', 16)
+DH_GROUP14_GENERATOR = 2
+
+
+class FingerprintService:
+    def __init__(self, timeout=DEFAULT_FINGERPRINT_TIMEOUT_SECONDS):
+        self.timeout = timeout
+
+    # SHA256 fingerprint of the server certificate, eg. DD:23:37:A7:...:AA:55:28
+    def get_ssl_thumbprint(self, host, port=443):
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        with socket.create_connection((host, port), timeout=self.timeout) as sock:
+            with context.wrap_socket(sock, server_hostname=host) as tls_sock:
+                cert = tls_sock.getpeercert(binary_form=True)
+        digest = hashlib.sha256(cert).hexdigest().upper()
+        return ':'.join(digest[i:i + 2] for i in range(0, len(digest), 2))
+
+    # SHA256 fingerprint of the RSA host key in OpenSSH format, eg. SHA256:uC0zLDfYZ3zGAkBx1iJ6pZSTF7TArSiQSTpZv9LAw18
+    def get_ssh_thumbprint(self, host, port=22):
+        with socket.create_connection((host, port), timeout=self.timeout) as sock:
+            reader = sock.makefile('rb')
+            sock.sendall(SSH_CLIENT_VERSION + b'\r\n')
+            self.__read_server_version(reader)
+            sock.sendall(self.__to_packet(self.__kexinit_payload()))
+
+            server_kexinit = self.__read_packet(reader, SSH_MSG_KEXINIT)
+            server_kex_algorithms = self.__read_name_list(server_kexinit, 17)
+            if not any(kex in server_kex_algorithms for kex in SSH_KEX_ALGORITHMS.split(',')):
+                raise ValueError("SSH server does not support any of the key exchange algorithms {}"
+                                 .format(SSH_KEX_ALGORITHMS))
+
+            private = int.from_bytes(os.urandom(32), 'big')
+            public = pow(DH_GROUP14_GENERATOR, private, DH_GROUP14_PRIME)
+            sock.sendall(self.__to_packet(bytes([SSH_MSG_KEXDH_INIT]) + self.__mpint(public)))
+
+            reply = self.__read_packet(reader, SSH_MSG_KEXDH_REPLY)
+            host_key_length = struct.unpack('>I', reply[1:5])[0]
+            host_key = reply[5:5 + host_key_length]
+        digest = base64.b64encode(hashlib.sha256(host_key).digest()).decode('ascii').rstrip('=')
+        return 'SHA256:' + digest
+
+    # Fetches ssl and ssh thumbprints of all hosts in parallel.
+    # Returns dict of host -> {'ssl': thumbprint or None, 'ssh': thumbprint or None, 'errors': [...]}
+    def fetch_thumbprints(self, hosts, ssl_port=443, ssh_port=22):
+        calls = {}
+        for host in set(hosts):
+            calls[(host, 'ssl')] = lambda host=host: self.get_ssl_thumbprint(host, ssl_port)
+            calls[(host, 'ssh')] = lambda host=host: self.get_ssh_thumbprint(host, ssh_port)
+        thumbprints = {}
+        for (host, kind), (thumbprint, error) in run_concurrently(calls, max_workers=len(calls)).items():
+            entry = thumbprints.setdefault(host, {'ssl': None, 'ssh': None, 'errors': []})
+            entry[kind] = thumbprint
+            if error is not None:
+                entry['errors'].append("Failed to fetch {} thumbprint of {}: {}".format(kind, host, error))
+        return thumbprints
+
+    def __read_server_version(self, reader):
+        # Servers may send banner lines before the identification string
+        while True:
+            line = reader.readline(256)
+            if not line:
+                raise ConnectionError("SSH server closed the connection before sending its version")
+            if line.startswith(b'SSH-'):
+                return line.strip()
+
+    def __kexinit_payload(self):
+        payload = bytes([SSH_MSG_KEXINIT]) + os.urandom(16)
+        for name_list in [SSH_KEX_ALGORITHMS, SSH_HOST_KEY_ALGORITHMS, SSH_CIPHERS, SSH_CIPHERS,
+                          SSH_MACS, SSH_MACS, 'none', 'none', '', '']:
+            payload += self.__string(name_list.encode('ascii'))
+        # first_kex_packet_follows = false, reserved = 0
+        return payload + b'\x00' + struct.pack('>I', 0)
+
+    def __to_packet(self, payload):
+        # Unencrypted binary packet, block size 8, at least 4 bytes of padding
+        padding_length = 8 - (len(payload) + 5) % 8
+        if padding_length < 4:
+            padding_length += 8
+        return struct.pack('>IB', len(payload) + padding_length + 1, padding_length) + payload + \
+            os.urandom(padding_length)
+
+    def __read_packet(self, reader, expected_type):
+        # Skips messages the server may interleave (eg. SSH_MSG_IGNORE/DEBUG) until expected_type arrives
+        while True:
+            header = self.__read_exact(reader, 5)
+            packet_length, padding_length = struct.unpack('>IB', header)
+            if packet_length > 256 * 1024:
+                raise ValueError("SSH packet too large ({} bytes)".format(packet_length))
+            body = self.__read_exact(reader, packet_length - 1)
+            payload = body[:len(body) - padding_length]
+            if payload and payload[0] == expected_type:
+                return payload
+
+    def __read_exact(self, reader, size):
+        data = reader.read(size)
+        if data is None or len(data) != size:
+            raise ConnectionError("SSH server closed the connection during key exchange")
+        return data
+
+    def __read_name_list(self, payload, offset):
+        length = struct.unpack('>I', payload[offset:offset + 4])[0]
+        return payload[offset + 4:offset + 4 + length].decode('ascii').split(',')
+
+    def __string(self, data):
+        return struct.pack('>I', len(data)) + data
+
+    def __mpint(self, value):
+        data = value.to_bytes((value.bit_length() + 7) // 8, 'big')
+        if data and data[0] & 0x80:
+            data = b'\x00' + data
+        return self.__string(data)
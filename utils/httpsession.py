@@ -0,0 +1,121 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: Shared connection-pooled HTTP session used by all automators
+
+import email.utils
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+__author__ = 'virtis'
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_KEEP_ALIVE = True
+DEFAULT_WAIT_WHEN_BUSY = True
+
+# Server signals that it is not ready to answer yet
+PROCESSING = 102
+TOO_MANY_REQUESTS = 429
+SERVICE_UNAVAILABLE = 503
+# Wait applied when a busy response has no (usable) Retry-After header
+DEFAULT_BUSY_WAIT_SECONDS = 5
+MAX_BUSY_WAIT_SECONDS = 60
+MAX_BUSY_RETRIES = 60
+
+_shared_session = None
+
+
+class HttpSession:
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, keep_alive=DEFAULT_KEEP_ALIVE,
+                 wait_when_busy=DEFAULT_WAIT_WHEN_BUSY):
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.wait_when_busy = wait_when_busy
+        self.busy_wait_seconds = 0
+        self.lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.verify = False
+        # One adapter for both schemes, SDDC Manager is reached over http (internal) and https (public API)
+        self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+
+    # Requests are fired immediately, the session only waits when the server says it is busy
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('verify', False)
+        response = self.session.request(method, url, **kwargs)
+        retries = 0
+        while self.wait_when_busy and retries < MAX_BUSY_RETRIES:
+            wait = self.__get_busy_wait(response)
+            if wait is None:
+                break
+            time.sleep(wait)
+            with self.lock:
+                self.busy_wait_seconds += wait
+            retries += 1
+            response = self.session.request(method, url, **kwargs)
+        return response
+
+    def __get_busy_wait(self, response):
+        if response.status_code in [PROCESSING, TOO_MANY_REQUESTS]:
+            return self.__parse_retry_after(response, DEFAULT_BUSY_WAIT_SECONDS)
+        # 503 without Retry-After is a real failure, not a "come back later"
+        if response.status_code == SERVICE_UNAVAILABLE and 'Retry-After' in response.headers:
+            return self.__parse_retry_after(response, DEFAULT_BUSY_WAIT_SECONDS)
+        return None
+
+    def __parse_retry_after(self, response, default):
+        # Retry-After is either delay-seconds or an HTTP-date
+        value = response.headers.get('Retry-After')
+        if value is None:
+            return default
+        wait = None
+        if value.strip().isdigit():
+            wait = int(value.strip())
+        else:
+            try:
+                wait = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                wait = default
+        return min(max(wait, 0), MAX_BUSY_WAIT_SECONDS)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request('PATCH', url, **kwargs)
+
+    def get_stats(self):
+        # urllib3 keeps per-pool counters of connections created and requests sent on them,
+        # every request beyond the first one on a connection is a keep-alive reuse
+        opened = sent = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            opened += pool.num_connections
+            sent += pool.num_requests
+        return {"requests": sent, "opened": opened, "reused": max(sent - opened, 0),
+                "busy_wait_seconds": self.busy_wait_seconds}
+
+    def close(self):
+        self.session.close()
+
+
+def configure_shared_session(pool_size=DEFAULT_POOL_SIZE, keep_alive=DEFAULT_KEEP_ALIVE,
+                             wait_when_busy=DEFAULT_WAIT_WHEN_BUSY):
+    global _shared_session
+    if _shared_session is not None:
+        _shared_session.close()
+    _shared_session = HttpSession(pool_size, keep_alive, wait_when_busy)
+    return _shared_session
+
+
+def get_shared_session():
+    if _shared_session is None:
+        return configure_shared_session()
+    return _shared_session
@@ -0,0 +1,134 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: Per-run SDDC Manager inventory snapshot, every collection fetched once and indexed
+
+import json
+import threading
+
+__author__ = 'virtis'
+
+MANAGEMENT_DOMAIN_TYPE = 'MANAGEMENT'
+
+_snapshots = {}
+_registry_lock = threading.Lock()
+
+
+class InventorySnapshot:
+    # utils is the Utils instance used for the REST calls. Collections are fetched lazily on first
+    # access and then served from the indexes for the rest of the run.
+    def __init__(self, utils):
+        self.utils = utils
+        self.hostname = utils.hostname
+        self.lock = threading.Lock()
+        self.domains = None
+        self.domains_by_id = {}
+        self.management_domain_id = None
+        self.clusters = None
+        self.clusters_by_id = {}
+        self.default_cluster_by_domain_id = {}
+        self.esxis = None
+        self.esxis_by_cluster_id = {}
+        # (domain id, cluster id) -> /v1/vxrail-managers response
+        self.vxrail_managers = {}
+
+    # Raw /v1/domains response, callers iterate over its 'elements'
+    def get_domains(self):
+        with self.lock:
+            if self.domains is None:
+                self.__load_domains()
+            return self.domains
+
+    def get_domain(self, domain_id):
+        self.get_domains()
+        return self.domains_by_id.get(domain_id)
+
+    def get_management_domain_id(self):
+        self.get_domains()
+        return self.management_domain_id
+
+    def get_cluster(self, cluster_id):
+        self.__ensure_clusters()
+        return self.clusters_by_id.get(cluster_id)
+
+    # Cluster with isDefault set in the given domain, None if there is none
+    def get_default_cluster(self, domain_id):
+        self.__ensure_clusters()
+        return self.default_cluster_by_domain_id.get(domain_id)
+
+    def get_esxis_in_cluster(self, cluster_id):
+        with self.lock:
+            if self.esxis is None:
+                self.__index_esxis(self.__get_inventory('/inventory/extensions/vi/esxis'))
+        return self.esxis_by_cluster_id.get(cluster_id, [])
+
+    # Raw /v1/vxrail-managers response of the cluster
+    def get_vxrail_managers(self, domain_id, cluster_id):
+        key = (domain_id, cluster_id)
+        with self.lock:
+            if key not in self.vxrail_managers:
+                self.vxrail_managers[key] = self.utils.get_request(
+                    'https://' + self.hostname + '/v1/vxrail-managers?domainId=' + domain_id + '&clusterId=' + cluster_id)
+            return self.vxrail_managers[key]
+
+    # Collections fetched so far, to hand them over to another process (see seed)
+    def export(self):
+        with self.lock:
+            return {'domains': self.domains, 'clusters': self.clusters, 'esxis': self.esxis,
+                    'vxrail_managers': dict(self.vxrail_managers)}
+
+    def seed(self, exported):
+        with self.lock:
+            if exported['domains'] is not None:
+                self.__index_domains(exported['domains'])
+            if exported['clusters'] is not None:
+                self.__index_clusters(exported['clusters'])
+            if exported['esxis'] is not None:
+                self.__index_esxis(exported['esxis'])
+            self.vxrail_managers.update(exported['vxrail_managers'])
+
+    def __load_domains(self):
+        self.__index_domains(self.utils.get_request('https://' + self.hostname + '/v1/domains'))
+
+    def __index_domains(self, domains):
+        self.domains = domains
+        self.domains_by_id = {}
+        for domain in domains['elements']:
+            self.domains_by_id[domain['id']] = domain
+            # Same as the previous linear scans, the last management domain wins
+            if domain['type'] == MANAGEMENT_DOMAIN_TYPE:
+                self.management_domain_id = domain['id']
+
+    def __ensure_clusters(self):
+        with self.lock:
+            if self.clusters is None:
+                self.__index_clusters(self.__get_inventory('/inventory/clusters'))
+
+    def __index_clusters(self, clusters):
+        self.clusters = clusters
+        self.clusters_by_id = {}
+        self.default_cluster_by_domain_id = {}
+        for cluster in clusters:
+            self.clusters_by_id[cluster['id']] = cluster
+            if cluster['isDefault']:
+                self.default_cluster_by_domain_id[cluster['domainId']] = cluster
+
+    def __index_esxis(self, esxis):
+        self.esxis = esxis
+        self.esxis_by_cluster_id = {}
+        for esxi in esxis:
+            self.esxis_by_cluster_id.setdefault(esxi.get('clusterId'), []).append(esxi)
+
+    def __get_inventory(self, path):
+        url = 'http://' + self.hostname + path
+        response = self.utils.http.get(url, headers={'Content-Type': 'application/json'})
+        if response.status_code != 200:
+            self.utils.printRed("Error executing API: {}, status code: {}".format(url, response.status_code))
+            exit(1)
+        return json.loads(response.text)
+
+
+# One snapshot per SDDC Manager for the whole run
+def get_inventory_snapshot(utils):
+    with _registry_lock:
+        if utils.hostname not in _snapshots:
+            _snapshots[utils.hostname] = InventorySnapshot(utils)
+        return _snapshots[utils.hostname]
@@ -0,0 +1,99 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: IPv4 helpers working on addresses packed into integers once
+
+import ipaddress
+
+__author__ = 'virtis'
+
+
+# "10.0.0.1" -> 167772161, None if address is not a dotted quad IPv4 address. Leading zeros are accepted
+# ("010.0.0.1"), same as the format checks of the inputs
+def ip_to_int(address):
+    if type(address) != str:
+        return None
+    octets = address.split('.')
+    if len(octets) != 4:
+        return None
+    value = 0
+    for octet in octets:
+        if not octet.isdigit() or not octet.isascii() or len(octet) > 3:
+            return None
+        octet = int(octet)
+        if octet > 255:
+            return None
+        value = (value << 8) | octet
+    return value
+
+
+def is_ipv4(address):
+    return ip_to_int(address) is not None
+
+
+# Lowest and highest of the addresses, skipping anything that is not an IPv4 address. The addresses are
+# returned as given, ('', '') if there is none
+def ip_range_bounds(addresses):
+    lowest = highest = None
+    for address in addresses:
+        value = ip_to_int(address)
+        if value is None:
+            continue
+        if lowest is None or value < lowest[0]:
+            lowest = (value, address)
+        if highest is None or value >= highest[0]:
+            highest = (value, address)
+    if lowest is None:
+        return '', ''
+    return lowest[1], highest[1]
+
+
+# Contiguous runs of the addresses as (start, end) integers, lowest first, eg. "10.0.0.1", "10.0.0.3",
+# "10.0.0.2", "10.0.0.9" -> [(167772161, 167772163), (167772169, 167772169)]. Anything that is not an IPv4
+# address is skipped, a repeated address counts once. Each address is looked at a constant number of times,
+# only the runs are sorted
+def ip_runs(addresses):
+    values = set()
+    for address in addresses:
+        value = ip_to_int(address)
+        if value is not None:
+            values.add(value)
+    runs = []
+    for value in values:
+        if value - 1 in values:
+            continue
+        end = value
+        while end + 1 in values:
+            end += 1
+        runs.append((value, end))
+    runs.sort()
+    return runs
+
+
+def int_to_ip(value):
+    return str(ipaddress.IPv4Address(value))
+
+
+# "10.0.0.1-10.0.0.10" -> (start, end) as integers. Raises ValueError if the range is not in that format
+def parse_ip_range(ip_range):
+    ips = ip_range.split('-')
+    if len(ips) != 2:
+        raise ValueError("IP range {} is not in start-end format".format(ip_range))
+    start, end = ip_to_int(ips[0].strip()), ip_to_int(ips[1].strip())
+    if start is None or end is None:
+        raise ValueError("IP range {} has an invalid IP address".format(ip_range))
+    return start, end
+
+
+# "10.0.0.1-10.0.0.10, 10.0.0.20-10.0.0.30" -> [(start, end), ...]
+def parse_ip_ranges(inputstr):
+    return [parse_ip_range(x.strip()) for x in inputstr.split(',')]
+
+
+# First and last address of the network as integers, eg. "10.0.0.0/24" -> (167772160, 167772415)
+def network_bounds(cidr):
+    network = ipaddress.IPv4Network(cidr, strict=False)
+    return int(network.network_address), int(network.broadcast_address)
+
+
+def ip_range_in_network(start, end, cidr):
+    first, last = network_bounds(cidr)
+    return first <= start <= last and first <= end <= last
@@ -0,0 +1,120 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: Incremental reader of the members of a top level JSON object
+
+import json
+
+__author__ = 'virtis'
+
+READ_CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\n\r'
+VALUE_TERMINATORS = ',:]}' + WHITESPACE
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    # Appends the next chunk, dropping what has been consumed already. The chunk is at least as big as what is
+    # still pending so a value spanning many chunks is decoded a logarithmic number of times. Returns False at
+    # end of file
+    def fill(self):
+        if self.eof:
+            return False
+        chunk = self.fp.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    # Next non whitespace character, not consumed. '' at end of file
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, chars):
+        c = self.peek()
+        if c == '' or c not in chars:
+            raise ValueError("Expecting one of {!r}, got {!r}".format(chars, c))
+        self.pos += 1
+        return c
+
+    # Decodes the next value. A number cut by the end of the buffer decodes as a shorter one (eg. "12" of "125" or
+    # "1" of "1.5"), so a value is only accepted once it is followed by a delimiter or the end of file
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+                if (end < len(self.buf) and self.buf[end] in VALUE_TERMINATORS) or self.eof:
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            if not self.fill():
+                obj, self.pos = _decoder.raw_decode(self.buf, self.pos)
+                return obj
+
+
+class StreamedArray:
+    # Array member value of iter_members, its elements are decoded one by one while iterating
+    def __init__(self, reader):
+        self.elements = _iter_elements(reader)
+
+    def __iter__(self):
+        return self.elements
+
+
+"""
+    Yields (key, value) for every member of the top level object of the JSON file fp, only holding one member
+    in memory at a time. Members named in streamed_arrays whose value is an array are yielded with a StreamedArray
+    as value instead, the elements are then decoded one by one while iterating over it. It is only valid until
+    the next member is requested, whatever is left of it is skipped.
+    Raises ValueError if fp is not a JSON object.
+"""
+def iter_members(fp, streamed_arrays=(), chunk_size=READ_CHUNK_SIZE):
+    reader = _Reader(fp, chunk_size)
+    reader.expect('{')
+    if reader.peek() == '}':
+        reader.pos += 1
+    else:
+        while True:
+            key = reader.value()
+            if type(key) != str:
+                raise ValueError("Expecting property name, got {!r}".format(key))
+            reader.expect(':')
+            if key in streamed_arrays and reader.peek() == '[':
+                reader.pos += 1
+                elements = StreamedArray(reader)
+                yield key, elements
+                for _ in elements.elements:
+                    pass
+            else:
+                yield key, reader.value()
+            if reader.expect(',}') == '}':
+                break
+    if reader.peek() != '':
+        raise ValueError("Extra data after the top level object")
+
+
+def _iter_elements(reader):
+    if reader.peek() == ']':
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(',]') == ']':
+            return
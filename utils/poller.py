@@ -0,0 +1,53 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: Exponential-backoff poller for long running SDDC Manager tasks/queries
+
+import random
+import time
+
+__author__ = 'virtis'
+
+DEFAULT_INITIAL_INTERVAL = 2
+DEFAULT_BACKOFF_FACTOR = 1.5
+DEFAULT_MAX_INTERVAL = 30
+DEFAULT_JITTER = 0.1
+
+
+class Poller:
+    # initial_interval, max_interval and deadline are in seconds. jitter is the fraction (0-1) by which
+    # each interval is randomly stretched/shrunk. deadline None means poll until done.
+    def __init__(self, initial_interval=DEFAULT_INITIAL_INTERVAL, backoff_factor=DEFAULT_BACKOFF_FACTOR,
+                 max_interval=DEFAULT_MAX_INTERVAL, jitter=DEFAULT_JITTER, deadline=None):
+        self.initial_interval = initial_interval
+        self.backoff_factor = backoff_factor
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.deadline = deadline
+        self.polls = 0
+        self.elapsed = 0
+
+    # Calls fetch() until is_done(response) is True and returns the last response.
+    # Returns None if the deadline passes first. on_progress(elapsed) is called after every
+    # unfinished poll so callers can print a heartbeat.
+    def poll(self, fetch, is_done, on_progress=None):
+        start = time.time()
+        interval = self.initial_interval
+        self.polls = 1
+        response = fetch()
+        while not is_done(response):
+            self.elapsed = time.time() - start
+            if on_progress is not None:
+                on_progress(self.elapsed)
+            wait = self.__next_wait(interval)
+            if self.deadline is not None and self.elapsed + wait > self.deadline:
+                return None
+            time.sleep(wait)
+            interval = min(interval * self.backoff_factor, self.max_interval)
+            self.polls += 1
+            response = fetch()
+        self.elapsed = time.time() - start
+        return response
+
+    def __next_wait(self, interval):
+        if self.jitter <= 0:
+            return interval
+        return max(interval * (1 + random.uniform(-self.jitter, self.jitter)), 0)
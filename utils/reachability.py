@@ -0,0 +1,95 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: Concurrent reachability probing (ICMP echo where permitted, TCP connect otherwise)
+
+import os
+import select
+import socket
+import struct
+import time
+from utils.concurrency import run_concurrently
+from utils.dnsresolver import get_shared_resolver
+
+__author__ = 'virtis'
+
+DEFAULT_PROBE_TIMEOUT_SECONDS = 2
+DEFAULT_PROBE_PORTS = (443, 22)
+PROBE_MAX_WORKERS = 32
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+
+class ReachabilityProber:
+    # timeout bounds every single ICMP echo / TCP connect attempt, in seconds
+    def __init__(self, timeout=DEFAULT_PROBE_TIMEOUT_SECONDS, ports=DEFAULT_PROBE_PORTS):
+        self.timeout = timeout
+        self.ports = ports
+        self.dns = get_shared_resolver()
+
+    # Returns (reachable, method) where method is 'icmp', 'tcp/<port>' or the reason the target is unreachable
+    def probe(self, target):
+        address = self.dns.resolve_ip(target)
+        if address is None:
+            return False, 'not resolvable'
+        if self.__icmp_echo(address):
+            return True, 'icmp'
+        # ICMP is either not permitted for unprivileged users or filtered, a listening service proves the same
+        for port in self.ports:
+            try:
+                with socket.create_connection((address, port), timeout=self.timeout):
+                    return True, 'tcp/{}'.format(port)
+            except OSError:
+                continue
+        return False, 'no icmp/tcp response'
+
+    # Probes all targets concurrently. Returns dict of target -> (reachable, method) in the order passed
+    def probe_many(self, targets):
+        targets = list(dict.fromkeys(t for t in targets if t))
+        calls = {target: (lambda target=target: self.probe(target)) for target in targets}
+        results = run_concurrently(calls, PROBE_MAX_WORKERS)
+        table = {}
+        for target in targets:
+            outcome, error = results[target]
+            table[target] = outcome if error is None else (False, str(error))
+        return table
+
+    def __icmp_echo(self, address):
+        # Unprivileged ICMP datagram socket, needs net.ipv4.ping_group_range on Linux. The kernel owns the
+        # identifier, so the reply is matched on sequence number and payload only.
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        except OSError:
+            return False
+        with sock:
+            sequence = int.from_bytes(os.urandom(2), 'big')
+            payload = os.urandom(16)
+            header = struct.pack('>BBHHH', ICMP_ECHO_REQUEST, 0, 0, 0, sequence)
+            checksum = self.__checksum(header + payload)
+            packet = struct.pack('>BBHHH', ICMP_ECHO_REQUEST, 0, checksum, 0, sequence) + payload
+            try:
+                sock.sendto(packet, (address, 0))
+            except OSError:
+                return False
+            deadline = time.time() + self.timeout
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0 or not select.select([sock], [], [], remaining)[0]:
+                    return False
+                try:
+                    reply = sock.recv(1024)
+                except OSError:
+                    return False
+                # Some platforms (eg. macOS) hand back the IP header as well
+                if len(reply) >= 20 and reply[0] >> 4 == 4:
+                    reply = reply[(reply[0] & 0x0F) * 4:]
+                if len(reply) >= 8 and reply[0] == ICMP_ECHO_REPLY and \
+                        struct.unpack('>H', reply[6:8])[0] == sequence and reply[8:] == payload:
+                    return True
+
+    def __checksum(self, data):
+        if len(data) % 2:
+            data += b'\x00'
+        total = sum(struct.unpack('>{}H'.format(len(data) // 2), data))
+        total = (total >> 16) + (total & 0xFFFF)
+        total += total >> 16
+        return ~total & 0xFFFF
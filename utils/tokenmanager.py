@@ -0,0 +1,65 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: Cached SDDC Manager access token shared by every Utils instance
+
+import base64
+import json
+import threading
+import time
+
+__author__ = 'virtis'
+
+# Refresh a little before the token really expires so in-flight requests don't race the expiry
+TOKEN_REFRESH_MARGIN_SECONDS = 60
+# Used when the token expiry can't be read from the token itself (SDDC Manager default lifetime)
+DEFAULT_TOKEN_LIFETIME_SECONDS = 60 * 60
+
+_token_managers = {}
+_registry_lock = threading.Lock()
+
+
+class TokenManager:
+    def __init__(self):
+        self.access_token = None
+        self.expires_at = 0
+        self.lock = threading.Lock()
+
+    # request_token is called only when there is no usable cached token and must return the
+    # /v1/tokens response body
+    def get_access_token(self, request_token):
+        with self.lock:
+            if self.access_token is None or time.time() >= self.expires_at - TOKEN_REFRESH_MARGIN_SECONDS:
+                response = request_token()
+                self.access_token = response['accessToken']
+                self.expires_at = self.__read_expiry(self.access_token)
+            return self.access_token
+
+    # Adopts a token fetched elsewhere, eg. by the parent of batch conversion worker processes
+    def seed(self, access_token):
+        with self.lock:
+            self.access_token = access_token
+            self.expires_at = self.__read_expiry(access_token)
+
+    def invalidate(self, access_token=None):
+        with self.lock:
+            # Only drop the token that was rejected, another caller may already have refreshed it
+            if access_token is None or access_token == self.access_token:
+                self.access_token = None
+                self.expires_at = 0
+
+    def __read_expiry(self, access_token):
+        # Access token is a JWT, its payload carries the expiry as 'exp' (epoch seconds)
+        try:
+            payload = access_token.split('.')[1]
+            payload += '=' * (-len(payload) % 4)
+            claims = json.loads(base64.urlsafe_b64decode(payload.encode('utf8')))
+            return int(claims['exp'])
+        except Exception:
+            return time.time() + DEFAULT_TOKEN_LIFETIME_SECONDS
+
+
+def get_token_manager(hostname, username, password):
+    key = (hostname, username, password)
+    with _registry_lock:
+        if key not in _token_managers:
+            _token_managers[key] = TokenManager()
+        return _token_managers[key]
@@ -3,18 +3,27 @@
 
 import collections
 import json
-import subprocess
-import time
-import requests
 import urllib3
 import getpass
 import re
+from utils.dnsresolver import get_shared_resolver
+from utils.httpsession import get_shared_session
+from utils.inventory import get_inventory_snapshot
+from utils.poller import Poller
+from utils.tokenmanager import get_token_manager
+from utils.versionindex import parse_version
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 MASKED_KEYS = ['password', 'nsxManagerAdminPassword', 'rootPassword', 'ssoDomainPassword']
-PROCESSING = 102
+UNAUTHORIZED = 401
+# The token request is sent without the Authorization of the (possibly stale) token it replaces
+TOKEN_REQUEST_HEADER = {'Content-Type': 'application/json', 'Accept': 'application/json'}
 MTU_SUPPORTED_VXRAIL_VERSION = "7.0.241"
+IN_PROGRESS_STATUSES = ['In Progress', 'IN_PROGRESS', 'Pending']
+VALIDATION_POLL_DEADLINE = 2 * 60 * 60  # 2 hours
+VALIDATION_PROGRESS_INTERVAL = 5 * 60  # 5 minutes
+HOST_DISCOVERY_POLL_DEADLINE = 30 * 60  # 30 minutes
 
 __author__ = 'virtis'
 
@@ -26,17 +35,34 @@ class Utils:
         self.password = args[2]
         self.header = {'Content-Type': 'application/json'}
         self.token_url = 'https://' + self.hostname + '/v1/tokens'
+        self.http = get_shared_session()
+        # Same credentials share one cached token across all automators
+        self.token_manager = get_token_manager(self.hostname, self.username, self.password)
+        self.dns = get_shared_resolver()
+        self.inventory = get_inventory_snapshot(self)
 
     def get_token(self):
-        payload = {"username": self.username, "password": self.password}
-        response = self.post_request(payload=payload, url=self.token_url)
-        token = response['accessToken']
+        token = self.token_manager.get_access_token(self.__request_token)
         self.header['Authorization'] = 'Bearer ' + token
+        return token
+
+    def __request_token(self):
+        payload = {"username": self.username, "password": self.password}
+        return self.post_request(payload=payload, url=self.token_url)
+
+    # Sends an authenticated request, a 401 means the cached token got revoked/expired early
+    # so it is refreshed once and the request retried
+    def __send_with_token(self, method, url, payload=None):
+        token = self.get_token()
+        response = self.http.request(method, url, headers=self.header, json=payload)
+        if response.status_code == UNAUTHORIZED:
+            self.token_manager.invalidate(token)
+            self.get_token()
+            response = self.http.request(method, url, headers=self.header, json=payload)
+        return response
 
     def get_request(self, url):
-        self.get_token()
-        time.sleep(5)
-        response = requests.get(url, headers=self.header, verify=False)
+        response = self.__send_with_token('GET', url)
         if response.status_code == 200 or response.status_code == 202:
             data = json.loads(response.text)
         else:
@@ -45,7 +71,10 @@ class Utils:
         return data
 
     def post_request(self, payload, url):
-        response = requests.post(url, headers=self.header, json=payload, verify=False)
+        if url == self.token_url:
+            response = self.http.post(url, headers=TOKEN_REQUEST_HEADER, json=payload)
+        else:
+            response = self.__send_with_token('POST', url, payload)
         if response.status_code == 200 or response.status_code == 202:
             data = json.loads(response.text)
             return data
@@ -55,8 +84,7 @@ class Utils:
             exit(1)
 
     def post_request_for_host_discovery(self, payload, url):
-        self.get_token()
-        response = requests.post(url, headers=self.header, json=payload, verify=False)
+        response = self.__send_with_token('POST', url, payload)
         if response.status_code in [200, 202]:
             return response
         else:
@@ -71,7 +99,7 @@ class Utils:
             exit(1)
 
     def patch_request(self, payload, url):
-        response = requests.patch(url, headers=self.header, json=payload, verify=False)
+        response = self.__send_with_token('PATCH', url, payload)
         if response.status_code == 202:
             data = json.loads(response.text)
             return data
@@ -84,47 +112,37 @@ class Utils:
 
     def poll_on_id(self, url):
         key = 'executionStatus'
-        response = self.get_request(url)
-        status = response[key]
-        total_time = 0
-        wait_time = 5 * 60  # 5 minutes
-        while status in ['In Progress', 'IN_PROGRESS', 'Pending']:
-            time.sleep(10)
-            response = self.get_request(url)
-            status = response[key]
-            # total_time + 15 (total_time + 10 sec sleep time + 5 sec get_request sleep time)
-            total_time = total_time + 15
-            if total_time % wait_time == 0:
+        next_progress = [VALIDATION_PROGRESS_INTERVAL]
+
+        def print_progress(elapsed):
+            if elapsed >= next_progress[0]:
                 self.printGreen("Validation is in progress")
-        if status == 'COMPLETED':
+                next_progress[0] += VALIDATION_PROGRESS_INTERVAL
+
+        poller = Poller(deadline=VALIDATION_POLL_DEADLINE)
+        response = poller.poll(lambda: self.get_request(url),
+                               lambda res: res[key] not in IN_PROGRESS_STATUSES, print_progress)
+        if response is None:
+            self.printRed('Validation did not complete within {} minutes'.format(VALIDATION_POLL_DEADLINE // 60))
+            exit(1)
+        if response[key] == 'COMPLETED':
             return response['resultStatus']
         else:
             self.printRed('Operation failed')
             exit(1)
 
-    def poll_on_queries_for_host_discovery(self, url):
-        response = self.get_request_for_host_discovery(url)
-        status = response['queryInfo']['status']
-        while status in ['In Progress', 'IN_PROGRESS', 'Pending']:
-            response = self.get_request_for_host_discovery(url)
-            status = response['queryInfo']['status']
-            time.sleep(10)
-        if status == 'COMPLETED':
-            return response['result']
-        else:
-            self.print_errors(response)
-            exit(1)
-
+    # 102 PROCESSING is waited out by the shared session before the response gets here
     def get_request_for_host_discovery(self, url):
-        self.get_token()
-        time.sleep(5)
-        response = requests.get(url, headers=self.header, verify=False)
-        while response.status_code == PROCESSING:
-            time.sleep(5)
-            response = requests.get(url, headers=self.header, verify=False)
+        response = self.__send_with_token('GET', url)
         data = json.loads(response.text)
         return data
 
+    def print_session_stats(self):
+        stats = self.http.get_stats()
+        self.printCyan("HTTP requests: {}, connections opened: {}, connections reused: {}"
+                       .format(stats['requests'], stats['opened'], stats['reused']))
+        self.printCyan("Time spent waiting on busy server: {:.1f}s".format(stats['busy_wait_seconds']))
+
     def print_errors(self, response):
         if response['queryInfo']['status'] == 'FAILED':
             self.printRed("Host discovery get api failed")
@@ -247,12 +265,7 @@ class Utils:
         return res
 
     def is_mtu_supported(self, vxrm_version):
-        is_mtu_supported = True
-        vxrail_version = int(vxrm_version.replace(".", ""))
-        vxrail_version_supported = int(MTU_SUPPORTED_VXRAIL_VERSION.replace(".", ""))
-        if vxrail_version < vxrail_version_supported:
-            is_mtu_supported = False
-        return is_mtu_supported
+        return parse_version(vxrm_version) >= parse_version(MTU_SUPPORTED_VXRAIL_VERSION)
 
     def valid_option(self, inputstr, choices):
         choice = str(inputstr).strip().lower()
@@ -341,25 +354,7 @@ class Utils:
         return res
 
     def nslookup_ip_from_dns(self, fqdn):
-        cmd = "nslookup {}".format(fqdn)
-        sub_popen = subprocess.Popen(cmd,
-                                     shell=True,
-                                     stdout=subprocess.PIPE,
-                                     stderr=subprocess.PIPE)
-        output, err = sub_popen.communicate()
-        if sub_popen.returncode > 0:
-            return None
-
-        thenext = False
-        # byte feature only supported in python 3
-        for aline in output.decode('utf8').split("\n"):
-            if thenext and str(aline).lower().startswith("address:"):
-                return aline.split(":")[-1].strip()
-            if str(aline).lower().startswith("name:"):
-                tail = aline.split(":")[-1].strip()
-                if tail == fqdn:
-                    thenext = True
-        return None
+        return self.dns.resolve_ip(fqdn)
 
     def valid_ip(self, inputstr):
         res = re.compile("(\d+\.\d+\.\d+\.\d+)$").match(inputstr) is not None and all(
@@ -0,0 +1,48 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: Semantic version parsing and nearest-lower version lookup
+
+import bisect
+import re
+
+__author__ = 'virtis'
+
+VERSION_COMPONENT_PATTERN = re.compile(r'\d+')
+
+
+# "7.0.241" -> (7, 0, 241), "7.0.410-26262" -> (7, 0, 410). Components are compared numerically so
+# 7.0.1000 sorts after 7.0.999 and before 7.1.0. Trailing zero components are dropped, "7.0" and "7.0.0" are
+# both (7,): as tuples (7, 0) would sort before (7, 0, 0)
+def parse_version(version):
+    parsed = []
+    for component in str(version).split('-')[0].split('.'):
+        match = VERSION_COMPONENT_PATTERN.match(component.strip())
+        if match is None:
+            break
+        parsed.append(int(match.group()))
+    if not parsed:
+        raise ValueError("Invalid version {}".format(version))
+    while len(parsed) > 1 and parsed[-1] == 0:
+        parsed.pop()
+    return tuple(parsed)
+
+
+class VersionIndex:
+    # entries: iterable of (version, value). Built once, lookups are O(log n)
+    def __init__(self, entries):
+        by_version = {}
+        for version, value in entries:
+            # First entry wins for duplicated versions
+            by_version.setdefault(parse_version(version), value)
+        self.versions = sorted(by_version)
+        self.values = [by_version[v] for v in self.versions]
+
+    def __len__(self):
+        return len(self.versions)
+
+    # Value of the highest version <= version, None if version is lower than all of them
+    def floor(self, version):
+        position = bisect.bisect_right(self.versions, parse_version(version))
+        return self.values[position - 1] if position else None
+
+    def lowest(self):
+        return self.values[0] if self.values else None
@@ -0,0 +1,68 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: Attribute paths compiled once into getters, and projections extracting many paths in one walk
+
+__author__ = 'Hong.Yuan'
+
+
+def _compile(attrs):
+    # int steps index lists, str steps look up dict keys, anything else is skipped
+    steps = []
+    for attr in attrs:
+        if type(attr) == int or type(attr) == str:
+            steps.append(attr)
+    return tuple(steps)
+
+
+def _step(jsonobj, attr):
+    if type(attr) == int:
+        if type(jsonobj) != list or len(jsonobj) <= attr:
+            return None, False
+        return jsonobj[attr], True
+    if type(jsonobj) != dict or attr not in jsonobj:
+        return None, False
+    return jsonobj[attr], True
+
+
+class AttrPath:
+    # attrs eg. ["vxrail_manager", "accounts", "root", "password"] or ["network", "vds", 0, "name"]
+    def __init__(self, attrs):
+        self.steps = _compile(attrs)
+
+    # Value at the path, None if jsonobj is None or any step of the path is missing
+    def get(self, jsonobj):
+        if jsonobj is None:
+            return None
+        for attr in self.steps:
+            jsonobj, found = _step(jsonobj, attr)
+            if not found:
+                return None
+        return jsonobj
+
+
+class AttrProjection:
+    # fields: dict of name -> attrs. Paths sharing a prefix walk it only once
+    def __init__(self, fields):
+        self.names = list(fields.keys())
+        # trie node: [names ending here, {attr: child node}]
+        self.root = [[], {}]
+        for name, attrs in fields.items():
+            node = self.root
+            for attr in _compile(attrs):
+                node = node[1].setdefault(attr, [[], {}])
+            node[0].append(name)
+
+    # Returns dict of name -> value, None for the paths missing in jsonobj
+    def extract(self, jsonobj):
+        values = dict.fromkeys(self.names)
+        if jsonobj is None:
+            return values
+        stack = [(self.root, jsonobj)]
+        while stack:
+            node, value = stack.pop()
+            for name in node[0]:
+                values[name] = value
+            for attr, child in node[1].items():
+                child_value, found = _step(value, attr)
+                if found:
+                    stack.append((child, child_value))
+        return values
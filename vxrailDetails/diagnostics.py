@@ -0,0 +1,83 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: Structured problems found while converting a VxRail first run JSON
+
+__author__ = 'Hong.Yuan'
+
+SEVERITY_ERROR = 'ERROR'
+SEVERITY_WARNING = 'WARNING'
+
+# Input file
+JSON_FILE_NOT_FOUND = 'JSON_FILE_NOT_FOUND'
+JSON_FILE_NOT_READABLE = 'JSON_FILE_NOT_READABLE'
+JSON_INVALID = 'JSON_INVALID'
+JSON_UNEXPECTED_CONTENT = 'JSON_UNEXPECTED_CONTENT'
+# Values of the input
+RESOURCE_NAME_INVALID = 'RESOURCE_NAME_INVALID'
+HOSTS_MISSING = 'HOSTS_MISSING'
+HOST_COUNT_UNSUPPORTED = 'HOST_COUNT_UNSUPPORTED'
+NETWORK_INVALID = 'NETWORK_INVALID'
+IP_POOL_NOT_CONTIGUOUS = 'IP_POOL_NOT_CONTIGUOUS'
+VCENTER_NOT_EXTERNAL = 'VCENTER_NOT_EXTERNAL'
+VCENTER_ADDRESS_MISSING = 'VCENTER_ADDRESS_MISSING'
+VCENTER_FQDN_INVALID = 'VCENTER_FQDN_INVALID'
+VCENTER_DOMAIN_MISMATCH = 'VCENTER_DOMAIN_MISMATCH'
+VCENTER_ALREADY_EXISTS = 'VCENTER_ALREADY_EXISTS'
+# Environment
+DNS_FQDN_NOT_RESOLVED = 'DNS_FQDN_NOT_RESOLVED'
+DNS_IP_NOT_RESOLVED = 'DNS_IP_NOT_RESOLVED'
+HOST_IP_MISMATCH = 'HOST_IP_MISMATCH'
+DOMAIN_NOT_FOUND = 'DOMAIN_NOT_FOUND'
+NIC_PROFILE_UNSUPPORTED = 'NIC_PROFILE_UNSUPPORTED'
+SAMPLE_JSON_FALLBACK = 'SAMPLE_JSON_FALLBACK'
+CONVERSION_ABORTED = 'CONVERSION_ABORTED'
+# The conversion itself failed, not the input
+CONVERTER_ERROR = 'CONVERTER_ERROR'
+
+
+class Diagnostic:
+    __slots__ = ('code', 'message', 'path', 'severity')
+
+    # path is the dotted path of the offending attribute in the VxRail JSON eg. hosts[1].network, None when
+    # the problem is not about one attribute
+    def __init__(self, code, message, path=None, severity=SEVERITY_ERROR):
+        self.code = code
+        self.message = message
+        self.path = path
+        self.severity = severity
+
+    def is_error(self):
+        return self.severity == SEVERITY_ERROR
+
+    def to_dict(self):
+        return {'code': self.code, 'severity': self.severity, 'path': self.path, 'message': self.message}
+
+    def __str__(self):
+        return self.message
+
+
+class Diagnostics:
+    # Problems in the order they were found, the same problem (code, path and message) is only kept once
+    def __init__(self):
+        self.items = []
+        self.seen = set()
+
+    def add(self, code, message, path=None, severity=SEVERITY_ERROR):
+        key = (code, path, message)
+        if key not in self.seen:
+            self.seen.add(key)
+            self.items.append(Diagnostic(code, message, path, severity))
+
+    def error(self, code, message, path=None):
+        self.add(code, message, path, SEVERITY_ERROR)
+
+    def warning(self, code, message, path=None):
+        self.add(code, message, path, SEVERITY_WARNING)
+
+    def has_errors(self):
+        return any(d.is_error() for d in self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
@@ -0,0 +1,53 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: Cached loading of data_passthrough_properties.yaml
+
+import os
+import threading
+import yaml
+from yaml.loader import SafeLoader
+from utils.versionindex import VersionIndex
+
+__author__ = 'Hong.Yuan'
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROPERTIES_FILE = os.path.join(PACKAGE_DIR, 'data_passthrough_properties.yaml')
+
+# properties file -> ((mtime, size), PassthroughConfig)
+_configs = {}
+_lock = threading.Lock()
+
+
+class PassthroughConfig:
+    # properties is the parsed yaml. Relative sample json paths are relative to the directory of the yaml file
+    def __init__(self, properties, base_dir):
+        self.data_passthrough = bool(properties.get('data_passthrough'))
+        vxrail_versions = properties.get('vxrail_versions') or []
+        if not isinstance(vxrail_versions, list):
+            raise ValueError("vxrail_versions should be a list of version and path")
+        entries = []
+        for value in vxrail_versions:
+            if not isinstance(value, dict) or 'version' not in value or 'path' not in value:
+                raise ValueError("Invalid vxrail_versions entry {}".format(value))
+            entries.append((str(value['version']), os.path.join(base_dir, str(value['path']))))
+        # version -> absolute sample json path
+        self.sample_json_index = VersionIndex(entries)
+
+
+# Returns the PassthroughConfig of properties_file, None if the file does not exist. The file is parsed again
+# only when its modification time or size changed. Raises yaml.YAMLError or ValueError if it is invalid.
+def load_passthrough_config(properties_file=PROPERTIES_FILE):
+    try:
+        stat = os.stat(properties_file)
+    except OSError:
+        return None
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _configs.get(properties_file)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with open(properties_file) as f:
+            properties = yaml.load(f, Loader=SafeLoader)
+        config = PassthroughConfig(properties if isinstance(properties, dict) else {},
+                                   os.path.dirname(os.path.abspath(properties_file)))
+        _configs[properties_file] = (signature, config)
+        return config
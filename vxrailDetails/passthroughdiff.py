@@ -0,0 +1,132 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: Iterative data passthrough diff between the VxRail first run JSON and the sample JSON index
+
+__author__ = 'Hong.Yuan'
+
+CONTEXT_WITH_KEY_VALUE_PAIR = 'contextWithKeyValuePair'
+ARRAY_CONTEXT_WITH_KEY_VALUE_PAIR = 'arrayContextWithKeyValuePair'
+
+# Datatypes of the attributes that can be passed through, anything else (null, float) is skipped.
+# json only produces these exact types so a type() lookup replaces the isinstance chain
+SIMPLE_DTYPES = {bool: 'BOOLEAN', int: 'INTEGER', str: 'STRING'}
+_EMPTY = {}
+_END = object()
+
+
+class _DictFrame:
+    __slots__ = ('items', 'sample_path', 'key', 'existing', 'scalar', 'diff')
+
+    # key is the tuple of attribute names from the root. existing is None for a non-scalar frame, otherwise
+    # the simple attributes identifying the array element (may be empty).
+    def __init__(self, node, sample_path, key, existing, scalar):
+        self.items = iter(node.items())
+        self.sample_path = sample_path
+        self.key = key
+        self.existing = existing
+        self.scalar = scalar
+        self.diff = []
+
+
+class _ListFrame:
+    __slots__ = ('elements', 'element_path', 'key')
+
+    def __init__(self, node, element_path, key):
+        self.elements = iter(node)
+        self.element_path = element_path
+        self.key = key
+
+
+class PassthroughDiff:
+    # Finds the properties which are there in the input json (json provided by user) but not in the sample json
+    # (sample json for a particular vxrail version). The input json is fed one top level member (or one element
+    # of a top level array) at a time, so it never has to be held in memory as a whole, and each member is walked
+    # with an explicit stack. Each call yields (CONTEXT_WITH_KEY_VALUE_PAIR, key, attributes) and
+    # (ARRAY_CONTEXT_WITH_KEY_VALUE_PAIR, key, entry) for what it was fed, key being the dotted hierarchy of the
+    # property eg. vcenter.accounts for input_json["vcenter"]["accounts"]. finish yields the new top level
+    # attributes which come last.
+    # Arrays are compared against the first element of the sample json array and arrays inside array elements
+    # are not supported.
+    def __init__(self, index):
+        self.index = index
+        self.root_children = index.children.get('', _EMPTY)
+        self.root_diff = []
+
+    def member(self, key, value):
+        if isinstance(value, dict):
+            return _walk(self.index, _DictFrame(value, self.root_children.get(key), (key,), None, False))
+        child_path = self.root_children.get(key)
+        if child_path is None:
+            dtype = SIMPLE_DTYPES.get(type(value))
+            if dtype is not None:
+                self.root_diff.append({'attributeName': key, 'value': value, 'datatype': dtype})
+        elif isinstance(value, list):
+            return _walk(self.index, _ListFrame(value, self.index.elements.get(child_path), (key,)))
+        return iter(())
+
+    # element of the top level array key, in array order. Same as member(key, [elements...])
+    def element(self, key, element):
+        child_path = self.root_children.get(key)
+        if child_path is None:
+            return iter(())
+        return _walk(self.index, _ListFrame((element,), self.index.elements.get(child_path), (key,)))
+
+    def finish(self):
+        if self.root_diff:
+            yield CONTEXT_WITH_KEY_VALUE_PAIR, '', self.root_diff
+
+
+def _walk(index, frame):
+    children = index.children
+    elements = index.elements
+    stack = [frame]
+    while stack:
+        frame = stack[-1]
+        if type(frame) is _ListFrame:
+            element = next(frame.elements, _END)
+            while element is not _END and not isinstance(element, dict):
+                element = next(frame.elements, _END)
+            if element is _END:
+                stack.pop()
+                continue
+            sample_children = children.get(frame.element_path, _EMPTY)
+            # Simple attributes of the element which already exist in the sample json identify on which
+            # array element the new attributes have to be added
+            existing = {}
+            for element_key, element_value in element.items():
+                if type(element_value) in SIMPLE_DTYPES and element_key in sample_children:
+                    existing[element_key] = element_value
+            stack.append(_DictFrame(element, frame.element_path, frame.key, existing, True))
+            continue
+
+        descended = False
+        sample_children = children.get(frame.sample_path, _EMPTY)
+        for k, v in frame.items:
+            if isinstance(v, dict):
+                # Dict inside an array element with identifying attributes stays scalar, otherwise non-scalar
+                if frame.existing:
+                    stack.append(_DictFrame(v, sample_children.get(k), frame.key + (k,), frame.existing, True))
+                else:
+                    stack.append(_DictFrame(v, sample_children.get(k), frame.key + (k,), None, False))
+                descended = True
+                break
+            child_path = sample_children.get(k)
+            if child_path is None:
+                dtype = SIMPLE_DTYPES.get(type(v))
+                if dtype is not None:
+                    frame.diff.append({'attributeName': k, 'value': v, 'datatype': dtype})
+            elif isinstance(v, list) and not frame.scalar:
+                stack.append(_ListFrame(v, elements.get(child_path), frame.key + (k,)))
+                descended = True
+                break
+        if descended:
+            continue
+
+        stack.pop()
+        if frame.diff:
+            key = '.'.join(frame.key)
+            if frame.scalar:
+                yield ARRAY_CONTEXT_WITH_KEY_VALUE_PAIR, key, \
+                    {'arrayAssociationContext': {'arrayAttributeIdsKeyValue': frame.existing},
+                     'simpleAttributes': frame.diff}
+            else:
+                yield CONTEXT_WITH_KEY_VALUE_PAIR, key, frame.diff
@@ -0,0 +1,61 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: Flattened path index of the VxRail sample first run JSONs used for data passthrough diffing
+
+import hashlib
+import json
+import threading
+
+__author__ = 'Hong.Yuan'
+
+# Array elements are indexed through their first element only, same as the passthrough diff compares them
+ARRAY_ELEMENT_SUFFIX = '[]'
+
+_indexes_by_hash = {}
+_lock = threading.Lock()
+
+
+class SampleJsonIndex:
+    # paths: dotted paths of the sample json, eg. 'network.vds[].portgroups[].type'
+    def __init__(self, paths):
+        # parent path -> {key: path} and array path -> first element path, so lookups during the diff are
+        # plain dict hits without building path strings
+        self.children = {}
+        self.elements = {}
+        for path in paths:
+            if path.endswith(ARRAY_ELEMENT_SUFFIX):
+                self.elements[path[:-len(ARRAY_ELEMENT_SUFFIX)]] = path
+            else:
+                parent, _, key = path.rpartition('.')
+                self.children.setdefault(parent, {})[key] = path
+
+
+# Set of the dotted paths of every attribute and first array element of sample_json
+def flatten_sample_json(sample_json):
+    paths = set()
+    stack = [('', sample_json)]
+    while stack:
+        path, node = stack.pop()
+        if isinstance(node, dict):
+            for k, v in node.items():
+                child_path = k if path == '' else path + '.' + k
+                paths.add(child_path)
+                stack.append((child_path, v))
+        elif isinstance(node, list) and node:
+            element_path = path + ARRAY_ELEMENT_SUFFIX
+            paths.add(element_path)
+            stack.append((element_path, node[0]))
+    return paths
+
+
+# Returns the SampleJsonIndex of the sample json file. Indexes are kept in memory for the run keyed by the
+# sha256 of the file content, so an edited sample json is re-indexed automatically.
+def load_sample_json_index(file_loc):
+    with open(file_loc, 'rb') as fp:
+        content = fp.read()
+    digest = hashlib.sha256(content).hexdigest()
+    with _lock:
+        index = _indexes_by_hash.get(digest)
+        if index is None:
+            index = SampleJsonIndex(flatten_sample_json(json.loads(content)))
+            _indexes_by_hash[digest] = index
+        return index
@@ -0,0 +1,109 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: Portgroup/VDS index of the VxRail first run JSON network.vds section, built in one pass
+
+__author__ = 'Hong.Yuan'
+
+SYSTEM_PG_TYPES = ["MANAGEMENT", "VSAN", "VMOTION", "VXRAILSYSTEMVM", "VXRAILDISCOVERY"]
+
+
+class VdsEntry:
+    __slots__ = ('vds', 'pg_types', 'vmnics', 'vmnic_to_uplink', 'has_mtu', 'mtu')
+
+    def __init__(self, vds):
+        self.vds = vds
+        # System portgroup types in the order they appear in the vds
+        self.pg_types = []
+        # Lower cased physical nics in nic_mappings order, and physical nic -> uplink name
+        self.vmnics = []
+        self.vmnic_to_uplink = {}
+        self.has_mtu = "mtu" in vds
+        self.mtu = vds.get("mtu")
+
+
+class VdsIndex:
+    # vdssets is network.vds of the VxRail JSON
+    def __init__(self, vdssets):
+        self.vdss = []
+        # portgroup type -> first portgroup of that type
+        self.pg_by_type = {}
+        # portgroup type -> vmk_mtu of the last portgroup of that type having one
+        self.pg_to_mtu = {}
+        # (portgroup type, active + standby uplinks) of every system portgroup in order
+        self.pg_uplinks = []
+        # mtu of the last vds having one
+        self.single_mtu = None
+        for vds in vdssets:
+            entry = VdsEntry(vds)
+            for pg in vds.get("portgroups", []):
+                pg_type = pg["type"]
+                if pg_type not in self.pg_by_type:
+                    self.pg_by_type[pg_type] = pg
+                if "vmk_mtu" in pg:
+                    self.pg_to_mtu[pg_type] = pg["vmk_mtu"]
+                if pg_type in SYSTEM_PG_TYPES:
+                    entry.pg_types.append(pg_type)
+                    failover_order = pg.get("failover_order", {})
+                    # Standby uplink is passed as active, in backend it is made standby
+                    self.pg_uplinks.append((pg_type, list(failover_order.get("active", [])) +
+                                            list(failover_order.get("standby", []))))
+            for nic_map in vds.get("nic_mappings", []):
+                for vmnic_to_uplink in nic_map["uplinks"]:
+                    vmnic = vmnic_to_uplink["physical_nic"].lower()
+                    entry.vmnics.append(vmnic)
+                    entry.vmnic_to_uplink[vmnic] = vmnic_to_uplink["name"]
+            if entry.has_mtu:
+                self.single_mtu = entry.mtu
+            self.vdss.append(entry)
+
+    # vlan could be 0 <= vlan <= 4096. Returning -1 if does not provided in vxrail json spec
+    def get_vlan(self, net_type):
+        pg = self.pg_by_type.get(net_type)
+        return -1 if pg is None else pg["vlan_id"]
+
+    def get_pg_name(self, net_type):
+        pg = self.pg_by_type.get(net_type)
+        if pg is None:
+            return None
+        return pg["name"] if "name" in pg and len(pg["name"].strip()) > 0 else None
+
+    # System portgroup types of the vds, VXRAILSYSTEMVM is reported as VM_MANAGEMENT when dvpg is on
+    def get_pg_types(self, entry, dvpg_is_on):
+        if not dvpg_is_on:
+            return tuple(entry.pg_types)
+        return tuple("VM_MANAGEMENT" if pg_type == "VXRAILSYSTEMVM" else pg_type for pg_type in entry.pg_types)
+
+
+class SystemVds:
+    __slots__ = ('pg_types', 'pg_type_set', 'vmnics', 'vmnic_to_uplink', 'mtu')
+
+    # pg_types is the tuple of system portgroup types of the vds in order, mtu is None when the vds has none
+    def __init__(self, pg_types, vmnics, vmnic_to_uplink, mtu):
+        self.pg_types = pg_types
+        self.pg_type_set = frozenset(pg_types)
+        self.vmnics = vmnics
+        self.vmnic_to_uplink = vmnic_to_uplink
+        self.mtu = mtu
+
+
+class VdsTopology:
+    # System vdss of the ADVANCED_VXRAIL_SUPPLIED_VDS nic profile in the order of the VxRail JSON, the ones
+    # without system portgroups are not part of it
+    def __init__(self, vdss):
+        self.vdss = vdss
+
+    # Number of system vdss having an mtu
+    def mtu_count(self):
+        return sum(1 for vds in self.vdss if vds.mtu is not None)
+
+    # mtu of the first system vds having one and any of pg_types
+    def mtu_for(self, pg_types):
+        for vds in self.vdss:
+            if vds.mtu and not vds.pg_type_set.isdisjoint(pg_types):
+                return vds.mtu
+        return None
+
+    def __len__(self):
+        return len(self.vdss)
+
+    def __iter__(self):
+        return iter(self.vdss)
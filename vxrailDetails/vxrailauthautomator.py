@@ -1,10 +1,10 @@
 # Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
 # Description: Prepare VxRail Manager Spec
-import ipaddress
 import json
-import os
 import requests
-import subprocess
+from utils.fingerprints import FingerprintService
+from utils.iputils import ip_range_in_network, parse_ip_range
+from utils.reachability import ReachabilityProber
 from utils.utils import Utils
 from vxrailDetails.vxrailjsonconverter import VxRailJsonConverter
 
@@ -19,6 +19,8 @@ class VxRailAuthAutomator:
         self.description = "VxRail Manager authentication details"
         self.two_line_separator = ['', '']
         self.converter = VxRailJsonConverter(args)
+        self.fingerprints = FingerprintService()
+        self.prober = ReachabilityProber()
 
     def main_func(self):
         self.utils.printCyan("Please enter VxRail Manager's root credentials:")
@@ -114,11 +116,9 @@ class VxRailAuthAutomator:
         return self.to_network_obj('MANAGEMENT', mgmt_vlan_id, mgmt_cidr, mgmt_subnet, mgmt_gateway, mgmt_ip_range, mgmt_mtu)
 
     def count_ip_pool_ranges(self, ip_range, cidr, hosts_spec_len):
-        ips = ip_range.split('-')
-        ip1 = int(ipaddress.IPv4Address(ips[0].strip()))
-        ip2 = int(ipaddress.IPv4Address(ips[1].strip()))
+        ip1, ip2 = parse_ip_range(ip_range)
 
-        if ipaddress.ip_address(ip1) and ipaddress.ip_address(ip2) not in ipaddress.ip_network(cidr):
+        if not ip_range_in_network(ip1, ip2, cidr):
             self.utils.printRed("IP pool range ips are not in the same network {}".format(cidr))
             return False
 
@@ -170,38 +170,32 @@ class VxRailAuthAutomator:
         return network_obj
 
     def get_ssh_thumbprint(self, fqdn):
-        cmd = "ssh-keygen -lf <(ssh-keyscan -t rsa {} 2>/dev/null) | cut -d' ' -f2".format(fqdn)
-        sub_popen = subprocess.Popen(cmd,
-                                     shell=True,
-                                     executable='/bin/bash',
-                                     stdout=subprocess.PIPE,
-                                     stderr=subprocess.PIPE)
-        output, err = sub_popen.communicate()
-        if sub_popen.returncode > 0:
-            self.utils.printRed("Error encountered when execute command locally - Command:{}".format(cmd))
+        try:
+            # eg. Output : SHA256:uC0zLDfYZ3zGAkBx1iJ6pZSTF7TArSiQSTpZv9LAw18
+            return self.fingerprints.get_ssh_thumbprint(fqdn)
+        except (OSError, ValueError) as e:
+            self.utils.printRed("Error encountered when fetching ssh thumbprint of {} - {}".format(fqdn, e))
             exit(1)
-        if type(output) == bytes:
-            output = bytes.decode(output)
-        # eg. Output : SHA256:uC0zLDfYZ3zGAkBx1iJ6pZSTF7TArSiQSTpZv9LAw18
-        return output.strip("\n")
 
     def get_ssl_thumbprint(self, fqdn):
-        cmd = "openssl s_client -connect {}:443 < /dev/null 2>/dev/null | openssl x509 " \
-              "-fingerprint -sha256 -noout -in /dev/stdin".format(fqdn)
-        sub_popen = subprocess.Popen(cmd,
-                                     shell=True,
-                                     stdout=subprocess.PIPE,
-                                     stderr=subprocess.PIPE)
-        output, err = sub_popen.communicate()
-        if sub_popen.returncode > 0:
-            self.utils.printRed("Error encountered when execute command locally - Command:{}".format(cmd))
+        try:
+            # eg. Output : DD:23:37:A7:46:5F:DF:BA:3D:14:C0:AA:FB:F7:20:96:9E:2C:A7:9B:03:44:AA:96:1A
+            # :5C:1C:91:27:AA:55:28
+            return self.fingerprints.get_ssl_thumbprint(fqdn)
+        except (OSError, ValueError) as e:
+            self.utils.printRed("Error encountered when fetching ssl thumbprint of {} - {}".format(fqdn, e))
             self.utils.printRed("Please check reachability of {}".format(fqdn))
             exit(1)
-        if type(output) == bytes:
-            output = bytes.decode(output)
-        # eg. Output : SHA256 Fingerprint=DD:23:37:A7:46:5F:DF:BA:3D:14:C0:AA:FB:F7:20:96:9E:2C:A7:9B:03:44:AA:96:1A
-        # :5C:1C:91:27:AA:55:28
-        return output.split("=")[1].strip()
+
+    # Fetches ssl and ssh thumbprints of the VxRail Manager in parallel, returns (ssl_thumbprint, ssh_thumbprint)
+    def get_thumbprints(self, fqdn):
+        thumbprints = self.fingerprints.fetch_thumbprints([fqdn])[fqdn]
+        if thumbprints['errors']:
+            for error in thumbprints['errors']:
+                self.utils.printRed(error)
+            self.utils.printRed("Please check reachability of {}".format(fqdn))
+            exit(1)
+        return thumbprints['ssl'], thumbprints['ssh']
 
     def select_nic_profile(self, vxrm_version):
         nic_profile_list = ["TWO_HIGH_SPEED", "FOUR_HIGH_SPEED"]
@@ -216,9 +210,18 @@ class VxRailAuthAutomator:
         selected_nic_profile = nic_profile_list[int(nic_selection) - 1]
         return selected_nic_profile
 
-    def check_reachability(self, vxrail_fqdn):
-        response = os.system("ping -c 1 {} 2>&1 > /dev/null".format(vxrail_fqdn))
-        if response != 0:
+    # Probes VxRail Manager and the given hosts concurrently and prints the reachability table.
+    # Only an unreachable VxRail Manager is fatal, host results are informational.
+    def check_reachability(self, vxrail_fqdn, hosts=()):
+        table = self.prober.probe_many([vxrail_fqdn] + list(hosts))
+        if len(table) > 1:
+            self.utils.printCyan("Reachability:")
+            self.utils.printBold("--Target--------------------------------Reachable--Method------------")
+            self.utils.printBold("---------------------------------------------------------------------")
+            for target, (reachable, method) in table.items():
+                self.utils.printBold(" {:<38} {:<10} {}".format(target, 'yes' if reachable else 'no', method))
+        # Empty targets are not probed, an empty VxRail Manager fqdn is not reachable either
+        if not table.get(vxrail_fqdn, (False, None))[0]:
             print(*self.two_line_separator, sep='\n')
             self.utils.printRed("VxRail Manager {} is not reachable".format(vxrail_fqdn))
             self.utils.printRed("Please make sure you have provided correct VxRail Manager and had run prerequisites of"
@@ -0,0 +1,248 @@
+# Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
+# Description: Convert many VxRail first run JSONs in parallel worker processes
+# Each input gives the Create Domain/Add Cluster payload parts that can be derived from the JSON and the
+# SDDC Manager inventory. Thumbprint trust, host discovery, NSX, datastore and licenses stay interactive.
+
+import json
+import os
+import yaml
+from concurrent.futures import ProcessPoolExecutor
+from yaml.loader import SafeLoader
+from utils.httpsession import configure_shared_session
+from utils.iputils import is_ipv4
+from utils.utils import Utils
+from vxrailDetails.attrpath import AttrProjection
+from vxrailDetails.diagnostics import CONVERSION_ABORTED, CONVERTER_ERROR, DOMAIN_NOT_FOUND, NIC_PROFILE_UNSUPPORTED, Diagnostic
+from vxrailDetails.vxrailjsonconverter import VxRailJsonConverter, read_vxrail_config
+
+__author__ = 'Hong.Yuan'
+
+BATCH_REPORT_FILE = 'batch_report.json'
+# Payloads hold the passwords of the JSONs, readable by the owner only
+PAYLOAD_FILE_MODE = 0o600
+VXRAIL_PRIMARY_HOST_MAJOR_VERSION_8 = 8
+
+# Names in a first run JSON that the conversion resolves in DNS, looked up once for the whole batch
+DNS_NAME_FIELDS = AttrProjection({
+    'top_level_domain': ["global", "top_level_domain"],
+    'hosts': ["hosts"],
+    'customer_supplied_vc_name_or_ip': ["vcenter", "customer_supplied_vc_name_or_ip"],
+    'customer_supplied_vc_name': ["vcenter", "customer_supplied_vc_name"]
+})
+
+_worker_args = None
+
+
+class VxRailJsonBatchConverter:
+    def __init__(self, args, workers=None):
+        self.args = args
+        self.utils = Utils(args)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+
+    # batch_path is either a directory (every *.json in it) or a yaml manifest listing the JSONs, each entry
+    # being a path or {'path': ..., 'domain': <domain name>}. Relative manifest paths are relative to the manifest.
+    # Returns list of (json path, domain name or None)
+    def collect_inputs(self, batch_path):
+        if os.path.isdir(batch_path):
+            return [(os.path.join(batch_path, f), None) for f in sorted(os.listdir(batch_path))
+                    if f.lower().endswith('.json')]
+        if not os.path.isfile(batch_path):
+            self.utils.printRed("Batch input {} is neither a directory nor a manifest file".format(batch_path))
+            exit(1)
+        try:
+            with open(batch_path) as f:
+                manifest = yaml.load(f, Loader=SafeLoader)
+        except yaml.YAMLError:
+            self.utils.printRed("Error parsing yaml file " + batch_path)
+            exit(1)
+        if not isinstance(manifest, list):
+            self.utils.printRed("Manifest {} should be a list of VxRail JSON paths".format(batch_path))
+            exit(1)
+        base_dir = os.path.dirname(os.path.abspath(batch_path))
+        inputs = []
+        for entry in manifest:
+            if isinstance(entry, dict):
+                path, domain = entry.get('path'), entry.get('domain')
+            else:
+                path, domain = entry, None
+            if not path:
+                self.utils.printRed("Manifest entry {} has no path".format(entry))
+                exit(1)
+            inputs.append((os.path.join(base_dir, str(path)), domain))
+        return inputs
+
+    # Converts every input of batch_path and writes one payload per input plus BATCH_REPORT_FILE to output_dir.
+    # domain_name is the domain the clusters are added to, None converts them for Create Domain; manifest
+    # entries can override it. Returns the report entries.
+    def run(self, batch_path, output_dir, domain_name=None, dvpg_is_on=False):
+        inputs = self.collect_inputs(batch_path)
+        if not inputs:
+            self.utils.printRed("No VxRail JSON found in {}".format(batch_path))
+            exit(1)
+        os.makedirs(output_dir, exist_ok=True)
+        tasks, report = self.__prepare_tasks(inputs, domain_name, output_dir)
+
+        self.utils.printGreen("Fetching inventory and resolving DNS names for {} VxRail JSONs...".format(len(inputs)))
+        seed = self.__prefetch(tasks)
+
+        self.utils.printGreen("Converting with {} worker processes...".format(min(self.workers, len(tasks) or 1)))
+        if self.workers == 1 or len(tasks) <= 1:
+            _init_worker(self.args, seed)
+            results = [convert_vxrail_json(task, dvpg_is_on) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks)), initializer=_init_worker,
+                                     initargs=(self.args, seed)) as executor:
+                results = list(executor.map(convert_vxrail_json, tasks, [dvpg_is_on] * len(tasks)))
+        report.extend(results)
+        report.sort(key=lambda r: r['index'])
+
+        with open(os.path.join(output_dir, BATCH_REPORT_FILE), 'w') as f:
+            json.dump(report, f, indent=2)
+        self.print_report(report, output_dir)
+        return report
+
+    def print_report(self, report, output_dir):
+        failed = [r for r in report if r['errors']]
+        self.utils.printCyan("Batch conversion of {} VxRail JSONs: {} converted, {} failed"
+                             .format(len(report), len(report) - len(failed), len(failed)))
+        for r in report:
+            if r['errors']:
+                self.utils.printRed("{}:".format(r['source']))
+                for err in r['errors']:
+                    self.utils.printRed("    {}".format(_format_diagnostic(err)))
+            else:
+                self.utils.printGreen("{} -> {}".format(r['source'], r['output']))
+            for warning in r['warnings']:
+                self.utils.printYellow("    {}".format(_format_diagnostic(warning)))
+        self.utils.printBold("Report written to {}".format(os.path.join(output_dir, BATCH_REPORT_FILE)))
+
+    def __prepare_tasks(self, inputs, domain_name, output_dir):
+        domains_by_name = {d['name']: d for d in self.utils.inventory.get_domains()['elements']}
+        all_vcenters_fqdn = [vc['fqdn'] for d in domains_by_name.values() for vc in d['vcenters']]
+        tasks = []
+        report = []
+        used_names = set()
+        for index, (path, entry_domain) in enumerate(inputs):
+            name = os.path.splitext(os.path.basename(path))[0]
+            output_name = name
+            suffix = 1
+            while output_name in used_names:
+                suffix += 1
+                output_name = "{}_{}".format(name, suffix)
+            used_names.add(output_name)
+            task = {'index': index, 'source': path, 'output': os.path.join(output_dir, output_name + '.json'),
+                    'domain_name': entry_domain or domain_name}
+            if task['domain_name'] is None:
+                task.update(is_primary=True, domain_id=None, existing_vcenters_fqdn=all_vcenters_fqdn)
+            elif task['domain_name'] in domains_by_name:
+                domain = domains_by_name[task['domain_name']]
+                task.update(is_primary=False, domain_id=domain['id'],
+                            existing_vcenters_fqdn=[vc['fqdn'] for vc in domain['vcenters']])
+            else:
+                report.append({'index': index, 'source': path, 'output': None, 'domainId': None, 'warnings': [],
+                               'errors': [Diagnostic(DOMAIN_NOT_FOUND, "Domain {} not found"
+                                                     .format(task['domain_name'])).to_dict()]})
+                continue
+            tasks.append(task)
+        return tasks, report
+
+    # Everything the workers would otherwise fetch on their own: access token, inventory, VxRail Manager
+    # versions and the DNS names of all the JSONs
+    def __prefetch(self, tasks):
+        token = self.utils.get_token()
+        inventory = self.utils.inventory
+        domain_ids = set()
+        for task in tasks:
+            domain_ids.add(inventory.get_management_domain_id() if task['is_primary'] else task['domain_id'])
+        for domain_id in domain_ids:
+            default_cluster = inventory.get_default_cluster(domain_id)
+            # A missing default cluster is reported by the conversion of the affected JSONs
+            if default_cluster is not None:
+                inventory.get_vxrail_managers(domain_id, default_cluster['id'])
+
+        fqdns = []
+        ips = []
+        for task in tasks:
+            try:
+                with open(task['source']) as fp:
+                    fields = DNS_NAME_FIELDS.extract(read_vxrail_config(fp))
+                topdomain = fields['top_level_domain']
+                for h in fields['hosts'] or []:
+                    fqdns.append("{}.{}".format(h["hostname"], topdomain))
+                    ips.extend(nw["ip"] for nw in h["network"] if nw["type"] == "MANAGEMENT")
+                for address in (fields['customer_supplied_vc_name_or_ip'], fields['customer_supplied_vc_name']):
+                    if address:
+                        (ips if is_ipv4(address) else fqdns).append(address)
+            except Exception:
+                # Unreadable/invalid JSONs are reported by their conversion
+                continue
+        self.utils.dns.resolve_many(fqdns, ips)
+        return {'token': token, 'inventory': inventory.export(), 'dns': self.utils.dns.export()}
+
+
+def _format_diagnostic(diagnostic):
+    if diagnostic['path']:
+        return "[{}] {}: {}".format(diagnostic['code'], diagnostic['path'], diagnostic['message'])
+    return "[{}] {}".format(diagnostic['code'], diagnostic['message'])
+
+
+# seed is plain data only (access token, inventory and DNS exports), the worker opens its own connections:
+# a forked worker would otherwise share the pooled sockets of the parent's session
+def _init_worker(args, seed):
+    global _worker_args
+    _worker_args = args
+    configure_shared_session()
+    utils = Utils(args)
+    utils.token_manager.seed(seed['token'])
+    utils.inventory.seed(seed['inventory'])
+    forward, reverse = seed['dns']
+    utils.dns.seed(forward, reverse)
+
+
+# Runs in the worker processes. Returns the report entry of the task, its errors and warnings being the
+# diagnostics of the conversion as dicts
+def convert_vxrail_json(task, dvpg_is_on):
+    result = {'index': task['index'], 'source': task['source'], 'output': None, 'domainId': task['domain_id'],
+              'errors': [], 'warnings': []}
+    converter = VxRailJsonConverter(_worker_args)
+    try:
+        diagnostics = converter.parse(task['domain_id'], task['source'], task['is_primary'],
+                                      task['existing_vcenters_fqdn'], dvpg_is_on) or []
+    except SystemExit:
+        diagnostics = [Diagnostic(CONVERSION_ABORTED, "Conversion aborted, see the messages printed above")]
+    except Exception as e:
+        # Problems of the input are diagnostics of parse, an exception is a failure of the converter. It is
+        # reported for this input only, the other conversions of the batch go on
+        diagnostics = [Diagnostic(CONVERTER_ERROR, "Converter failed on this input ({}: {})"
+                                  .format(type(e).__name__, e))]
+    for d in diagnostics:
+        result['errors' if d.is_error() else 'warnings'].append(d.to_dict())
+    if result['errors']:
+        return result
+
+    vxm_payload = converter.get_vxm_payload()
+    if int(converter.vxrm_version[0]) >= VXRAIL_PRIMARY_HOST_MAJOR_VERSION_8 \
+            and vxm_payload['nicProfile'] == 'FOUR_EXTREME_SPEED':
+        result['errors'].append(Diagnostic(NIC_PROFILE_UNSUPPORTED, "Nic profile FOUR_EXTREME_SPEED is not supported"
+                                                                    " for VxRail version {}"
+                                           .format(converter.vxrm_version), "network.nic_profile").to_dict())
+        return result
+
+    cluster_spec = {'name': converter.get_cluster_name(),
+                    'skipThumbprintValidation': False,
+                    'vxRailDetails': vxm_payload,
+                    'hostSpecs': converter.get_host_spec()}
+    payload = {'computeSpec': {'clusterSpecs': [cluster_spec]}}
+    if task['is_primary']:
+        payload['vcenterSpec'] = converter.get_vcenter_spec()
+    else:
+        payload['domainId'] = task['domain_id']
+    # The payload is submitted as it is, passwords included, so only the owner can read it. The report and the
+    # console output only carry the diagnostics.
+    fd = os.open(task['output'], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, PAYLOAD_FILE_MODE)
+    with os.fdopen(fd, 'w') as f:
+        # An existing file keeps its mode on open
+        os.fchmod(f.fileno(), PAYLOAD_FILE_MODE)
+        json.dump(payload, f, indent=2, sort_keys=True)
+    result['output'] = task['output']
+    return result
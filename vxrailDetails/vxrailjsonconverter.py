@@ -1,20 +1,85 @@
 # Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
 # Description: VxRail Json Converter
 
-import functools
 import ipaddress
 import json
 import os
-import re
-import requests
-import subprocess
 import yaml
-from yaml.loader import SafeLoader
+from utils.iputils import int_to_ip, ip_range_bounds, ip_runs, is_ipv4
+from utils.jsonstream import StreamedArray, iter_members
 from utils.utils import Utils
+from vxrailDetails.attrpath import AttrPath, AttrProjection
+from vxrailDetails.diagnostics import Diagnostics, DNS_FQDN_NOT_RESOLVED, DNS_IP_NOT_RESOLVED, HOST_COUNT_UNSUPPORTED, \
+    HOST_IP_MISMATCH, HOSTS_MISSING, IP_POOL_NOT_CONTIGUOUS, JSON_FILE_NOT_FOUND, JSON_FILE_NOT_READABLE, JSON_INVALID, \
+    JSON_UNEXPECTED_CONTENT, NETWORK_INVALID, RESOURCE_NAME_INVALID, SAMPLE_JSON_FALLBACK, VCENTER_ADDRESS_MISSING, VCENTER_ALREADY_EXISTS, \
+    VCENTER_DOMAIN_MISMATCH, VCENTER_FQDN_INVALID, VCENTER_NOT_EXTERNAL
+from vxrailDetails.passthroughdiff import CONTEXT_WITH_KEY_VALUE_PAIR, PassthroughDiff
+from vxrailDetails.passthroughconfig import PROPERTIES_FILE, load_passthrough_config
+from vxrailDetails.samplejsonindex import load_sample_json_index
+from vxrailDetails.vdsindex import SystemVds, VdsIndex, VdsTopology
 
 __author__ = 'Hong.Yuan'
 
-MANAGMENT = 'MANAGEMENT'
+# Fields of the VxRail JSON used by the conversion
+VXRAIL_CONFIG_FIELDS = AttrProjection({
+    'vds': ["network", "vds"],
+    'nic_profile': ["network", "nic_profile"],
+    'hosts': ["hosts"],
+    'cluster_name': ["vcenter", "cluster_name"],
+    'customer_supplied': ["vcenter", "customer_supplied"],
+    'customer_supplied_vc_name_or_ip': ["vcenter", "customer_supplied_vc_name_or_ip"],
+    'customer_supplied_vc_name': ["vcenter", "customer_supplied_vc_name"],
+    'datacenter_name': ["vcenter", "datacenter_name"],
+    'vxm_name': ["vxrail_manager", "name"],
+    'vxm_ip': ["vxrail_manager", "ip"],
+    'vxm_root_password': ["vxrail_manager", "accounts", "root", "password"],
+    'vxm_service_username': ["vxrail_manager", "accounts", "service", "username"],
+    'vxm_service_password': ["vxrail_manager", "accounts", "service", "password"],
+    'top_level_domain': ["global", "top_level_domain"],
+    'cluster_type': ["global", "cluster_type"],
+    'cluster_management_netmask': ["global", "cluster_management_netmask"],
+    'cluster_management_gateway': ["global", "cluster_management_gateway"],
+    'cluster_vmotion_netmask': ["global", "cluster_vmotion_netmask"],
+    'cluster_vsan_netmask': ["global", "cluster_vsan_netmask"],
+    'cluster_systemvm_netmask': ["global", "cluster_systemvm_netmask"],
+    'cluster_systemvm_gateway': ["global", "cluster_systemvm_gateway"]
+})
+HOST_ROOT_PASSWORD = AttrPath(["accounts", "root", "password"])
+# Top level sections of the VxRail JSON read by the conversion, and the attributes kept of each host
+CONVERTED_SECTIONS = ('version', 'global', 'vcenter', 'vxrail_manager', 'network')
+HOST_ATTRIBUTES = ('hostname', 'host_psnt', 'network', 'accounts')
+
+
+# Streams the VxRail JSON fp and only keeps what the conversion reads, the hosts being trimmed to
+# HOST_ATTRIBUTES one at a time. Large first run JSONs (many hosts, certificates, ...) are never held in memory
+# as a whole. Raises ValueError if fp is not a JSON object.
+# When passthrough_diff is given, every top level member (every host for hosts) is diffed in the same pass,
+# before it is trimmed, and the new attributes found are appended to new_attributes.
+def read_vxrail_config(fp, passthrough_diff=None, new_attributes=None):
+    vxrail_config = {}
+    for key, value in iter_members(fp, ('hosts',)):
+        if key == 'hosts' and isinstance(value, StreamedArray):
+            hosts = []
+            for host in value:
+                if passthrough_diff is not None:
+                    new_attributes.extend(passthrough_diff.element(key, host))
+                hosts.append(_trim_host(host))
+            vxrail_config[key] = hosts
+            continue
+        if passthrough_diff is not None:
+            new_attributes.extend(passthrough_diff.member(key, value))
+        if key == 'hosts' or key in CONVERTED_SECTIONS:
+            vxrail_config[key] = value
+    if passthrough_diff is not None:
+        new_attributes.extend(passthrough_diff.finish())
+    return vxrail_config
+
+
+def _trim_host(host):
+    if not isinstance(host, dict):
+        return host
+    return {k: v for k, v in host.items() if k in HOST_ATTRIBUTES}
+
 
 
 class VxRailJsonConverter:
@@ -25,370 +90,286 @@ class VxRailJsonConverter:
         self.vds_pg_map = {}
         self.vxm_payload = None
         self.host_spec = None
-        self.error_message = []
+        self.diagnostics = Diagnostics()
         self.vxrail_config = None
+        # New attributes of the input json against the sample json, when data passthrough is on
+        self.passthrough_attributes = []
         self.vxrm_version = None
         self.is_mtu_supported = False
+        self.vds_index = None
+        self.config_fields = {}
+        # Part of the VxRail JSON being converted, reported when its content is not what the conversion expects
+        self.json_path = None
         self.hostname = args[0]
 
-    def __ip_comparator(self, ip1, ip2):
-        ipsegs1 = ip1.split('.')
-        ipsegs2 = ip2.split('.')
-        for i in [0, 1, 2, 3]:
-            res = int(ipsegs1[i]) - int(ipsegs2[i])
-            if res == 0:
-                continue
-            return res
-        return 0
-
-    def __get_ip_range(self, ipsegs):
-        ipnonemptysets = [ip for ip in ipsegs if self.__is_address_a_ip(ip)]
-        if len(ipnonemptysets) == 0:
-            return '', ''
-        elif len(ipnonemptysets) < 2:
-            return ipnonemptysets[0], ipnonemptysets[0]
-        sortedips = sorted(ipnonemptysets, key=functools.cmp_to_key(self.__ip_comparator))
-        return sortedips[0], sortedips[-1]
-
-    def __is_address_a_ip(self, address):
-        return re.match(r'\d{1,3}.\d{1,3}.\d{1,3}.\d{1,3}', address) is not None
-
-    def __parse_fqdn_from_ip(self, address):
-        rec, res = self.__local_run_command("nslookup {}".format(address))
-        if rec > 0:
-            self.__log_error("Failed to resolute FQDN according to IP {}".format(address))
-            return None
-        fqdn = None
-        for onere in res.split("\n"):
-            onere = onere.strip()
-            if onere.find("name") > 0 and onere.find("=") > 0:
-                fqdn = onere.split("=")[-1].strip()
-                if fqdn.endswith("."):
-                    fqdn = fqdn[0:-1]
+    def __parse_fqdn_from_ip(self, address, path):
+        fqdn = self.utils.dns.resolve_fqdn(address)
+        if fqdn is None:
+            self.__log_error(DNS_FQDN_NOT_RESOLVED, "Failed to resolute FQDN according to IP {}".format(address), path)
         return fqdn
 
-    def __parse_ip_from_fqdn(self, fqdn):
-        rec, res = self.__local_run_command("nslookup {}".format(fqdn))
-        if rec > 0:
-            self.__log_error("Failed to resolve IP address from FQDN {}".format(fqdn))
-            return None
-        ipaddr = None
-        isafter = False
-        for onere in res.split("\n"):
-            onere = onere.strip()
-            if onere.startswith("Name"):
-                fqdn = onere.split(":")[-1].strip()
-                isafter = True
-            elif onere.startswith("Address") and isafter:
-                ipaddr = onere.split(":")[-1].strip()
-                break
+    def __parse_ip_from_fqdn(self, fqdn, path):
+        ipaddr = self.utils.dns.resolve_ip(fqdn)
+        if ipaddr is None:
+            self.__log_error(DNS_IP_NOT_RESOLVED, "Failed to resolve IP address from FQDN {}".format(fqdn), path)
         return ipaddr
 
-    def __log_error(self, msg):
-        self.error_message.append(msg)
-
-    def __local_run_command(self, cmd):
-        sub_popen = subprocess.Popen(cmd,
-                                     shell=True,
-                                     stdout=subprocess.PIPE,
-                                     stderr=subprocess.PIPE)
-        output, err = sub_popen.communicate(None)
-        if sub_popen.returncode > 0:
-            # self.__log_error("Error to execute command: {}".format(cmd))
-            output = err
-        if type(output) == bytes:
-            output = bytes.decode(output)
-        return sub_popen.returncode, output
+    def __log_error(self, code, msg, path=None):
+        self.diagnostics.error(code, msg, path)
 
     def __netmask_to_cidr(self, netmask):
         return sum([bin(int(x)).count('1') for x in netmask.split('.')])
 
     def __get_ipfirst3_from_pools(self, ippools):
         for ip in ippools:
-            if self.__is_address_a_ip(ip["start"]):
+            if is_ipv4(ip["start"]):
                 ipseg = ip["start"].split(".")
                 return "{}.{}.{}".format(ipseg[0], ipseg[1], ipseg[2])
         return "0.0.0"
 
-    def __valid_resource_name(self, name, mystr):
+    def __valid_resource_name(self, name, mystr, path):
         res = True
         if not name:
-            self.__log_error("{} is Blank/Empty".format(mystr))
+            self.__log_error(RESOURCE_NAME_INVALID, "{} is Blank/Empty".format(mystr), path)
             res = False
         else:
             if len(name) > 80:
-                self.__log_error("{} size should not be more than 80".format(mystr))
+                self.__log_error(RESOURCE_NAME_INVALID, "{} size should not be more than 80".format(mystr), path)
                 res = False
         return res
 
+    # Returns the Diagnostics of everything found wrong in the VxRail JSON, None if there is nothing.
+    # Conversion went through only if none of them is an error, see Diagnostics.has_errors
     def parse(self, selected_domain_id, jsonfile, is_primary, existing_vcenters_fqdn=None, dvpg_is_on=False):
+        self.diagnostics = Diagnostics()
         if not os.path.exists(jsonfile):
-            self.__log_error("VxRail JSON file doesn't exists at {}".format(jsonfile))
+            self.__log_error(JSON_FILE_NOT_FOUND, "VxRail JSON file doesn't exists at {}".format(jsonfile))
         else:
             self.compute_spec = {}
+            # The sample json to diff against depends on the VxRail version, it is known before the input json
+            # is read so the diff is done in the same pass
+            self.get_vxrm_version(selected_domain_id)
+            passthrough_diff = self.__get_passthrough_diff()
+            self.passthrough_attributes = []
             try:
                 with open(jsonfile) as fp:
-                    self.vxrail_config = json.load(fp)
-                cluster_name = self.__get_attr_value(self.vxrail_config, ["vcenter", "cluster_name"])
-                if self.__valid_resource_name(cluster_name, "Cluster Name"):
+                    self.vxrail_config = read_vxrail_config(fp, passthrough_diff, self.passthrough_attributes)
+            except ValueError:
+                self.__log_error(JSON_INVALID, "VxRail JSON file is not in JSON format")
+                return self.diagnostics
+            except OSError as e:
+                self.__log_error(JSON_FILE_NOT_READABLE, "VxRail JSON file can't be read: {}".format(e.strerror))
+                return self.diagnostics
+            try:
+                # All the fields used by the conversion are extracted in one walk of the json
+                self.config_fields = VXRAIL_CONFIG_FIELDS.extract(self.vxrail_config)
+                # Every portgroup/vds lookup below is served from this index
+                self.json_path = "network.vds"
+                self.vds_index = VdsIndex(self.config_fields['vds'])
+                self.json_path = "vcenter"
+                cluster_name = self.config_fields['cluster_name']
+                if self.__valid_resource_name(cluster_name, "Cluster Name", "vcenter.cluster_name"):
                     self.cluster_name = cluster_name
                 if is_primary:
                     self.__convert_vcenter_spec(existing_vcenters_fqdn)
                 else:
                     self.__validate_vcenter_vc_name_or_ip(existing_vcenters_fqdn)
-                self.__convert_vxm_payload(selected_domain_id, dvpg_is_on)
+                self.json_path = "network"
+                self.__convert_vxm_payload(dvpg_is_on)
+                self.json_path = "network.vds"
                 self.__collect_pg_names()
+                self.json_path = "hosts"
                 self.__convert_host_spec()
-            except Exception as e:
-                self.__log_error("VxRail JSON file is not in JSON format")
-        return self.error_message if len(self.error_message) > 0 else None
-
-    def __get_attr_value(self, jsonobj, attrs=None):
-        if attrs is None:
-            attrs = []
-        if jsonobj is None:
-            return None
-        for attr in attrs:
-            if type(attr) == int:
-                if type(jsonobj) != list or len(jsonobj) <= attr:
-                    return None
-                jsonobj = jsonobj[attr]
-            elif type(attr) == str:
-                if type(jsonobj) != dict or attr not in jsonobj:
-                    return None
-                jsonobj = jsonobj[attr]
-        return jsonobj
+            except KeyError as e:
+                self.__log_error(JSON_UNEXPECTED_CONTENT, "VxRail JSON has unexpected content, attribute {} is missing"
+                                 " in {}".format(e, self.json_path), self.json_path)
+            except (IndexError, TypeError, ValueError) as e:
+                # Attribute of an unexpected type or value somewhere in the json. Anything else is a problem of
+                # the conversion itself and is raised as it is
+                self.__log_error(JSON_UNEXPECTED_CONTENT, "VxRail JSON has unexpected content in {} ({}: {})"
+                                 .format(self.json_path, type(e).__name__, e), self.json_path)
+        return self.diagnostics if len(self.diagnostics) > 0 else None
 
     def __get_pgs_mtu_value(self):
-        pg_to_mtu = {}
-        vdssets = self.__get_attr_value(self.vxrail_config, ["network", "vds"])
-        for vdsset in vdssets:
-            for pg in vdsset["portgroups"]:
-                if "vmk_mtu" in pg:
-                    pg_to_mtu[pg["type"]] = pg["vmk_mtu"]
-        return pg_to_mtu
+        return dict(self.vds_index.pg_to_mtu)
 
     # vlan could be 0 <= vlan <= 4096. Returning -1 if does not provided in vxrail json spec
     def __get_vlan(self, net_type):
-        vdssets = self.__get_attr_value(self.vxrail_config, ["network", "vds"])
-        for vdsset in vdssets:
-            for pg in vdsset["portgroups"]:
-                if pg["type"] == net_type:
-                    return pg["vlan_id"]
-        return -1
+        return self.vds_index.get_vlan(net_type)
 
     def get_single_system_dvs_mtu(self):
-        vdssets = self.__get_attr_value(self.vxrail_config, ["network", "vds"])
-        mtu = None
-        for vdsset in vdssets:
-            if "mtu" in vdsset:
-                mtu = vdsset["mtu"]
-        return mtu
-
-    def get_vmnics_mapped_to_system_dvs(self, dvpg_is_on, is_mtu_supported):
-        vdssets = self.__get_attr_value(self.vxrail_config, ["network", "vds"])
+        return self.vds_index.single_mtu
 
-        if len(vdssets) > 2:
+    # VdsTopology of the system vdss for the ADVANCED_VXRAIL_SUPPLIED_VDS nic profile, mtu is only taken
+    # when is_mtu_supported
+    def get_vds_topology(self, dvpg_is_on, is_mtu_supported):
+        if len(self.vds_index.vdss) > 2:
             print("\033[91m More than two system dvs with ADVANCED_VXRAIL_SUPPLIED_VDS nic profile not supported\033["
                   "00m")
             exit(1)
 
-        pg_types_to_vmnics = {}
-        pg_types_to_mtu = {}
-
-        pg_types = ["MANAGEMENT", "VSAN", "VMOTION", "VXRAILSYSTEMVM", "VXRAILDISCOVERY"]
-        for vdsset in vdssets:
-            pg_types_per_vds = []
-            mgmt_is_present = False
-            vm_mgmt_is_present = False
-            for pg in vdsset["portgroups"]:
-                if pg["type"] in pg_types:
-                    if pg["type"] == "MANAGEMENT":
-                        mgmt_is_present = True
-                    if pg["type"] == "VXRAILSYSTEMVM" and dvpg_is_on:
-                        vm_mgmt_is_present = True
-                        pg_types_per_vds.append("VM_MANAGEMENT")
-                    else:
-                        pg_types_per_vds.append(pg["type"])
-
+        system_vdss = []
+        for vds in self.vds_index.vdss:
+            pg_types_per_vds = self.vds_index.get_pg_types(vds, dvpg_is_on)
+            mgmt_is_present = "MANAGEMENT" in pg_types_per_vds
+            vm_mgmt_is_present = "VM_MANAGEMENT" in pg_types_per_vds
             if mgmt_is_present != vm_mgmt_is_present and dvpg_is_on:
                 print("\033[91m MANAGEMENT and VM_MANAGEMENT port groups must be in the same VDS\033[""00m")
                 exit(1)
             if len(pg_types_per_vds) > 0:
-                key = json.dumps(pg_types_per_vds)
-                pg_types_to_vmnics[key] = self.__get_vmnics(vdsset)
-                if is_mtu_supported:
-                    if "mtu" in vdsset:
-                        pg_types_to_mtu[key] = vdsset["mtu"]
-        return pg_types_to_vmnics, pg_types_to_mtu
-
-    def __get_vmnics(self, vdsset):
-        vmnics = []
-        for nic_map in vdsset["nic_mappings"]:
-            for vmnic_to_uplink in nic_map["uplinks"]:
-                vmnics.append(vmnic_to_uplink["physical_nic"].lower())
-        if len(vmnics) > 4:
+                system_vdss.append(SystemVds(pg_types_per_vds, self.__get_vmnics(vds), dict(vds.vmnic_to_uplink),
+                                             vds.mtu if is_mtu_supported and vds.has_mtu else None))
+        return VdsTopology(system_vdss)
+
+    def __get_vmnics(self, vds):
+        if len(vds.vmnics) > 4:
             print("\033[91m More than four vmnics per system dvs is not supported with ADVANCED_VXRAIL_SUPPLIED_VDS "
                   "nic profile\033[00m")
             exit(1)
-        return vmnics
-
-    def get_vmnic_to_uplink_mapping_for_vdss(self, dvpg_is_on):
-        vdssets = self.__get_attr_value(self.vxrail_config, ["network", "vds"])
-        pgtypes_to_vmnicuplink_mapping = {}
-        pg_types = ["MANAGEMENT", "VSAN", "VMOTION", "VXRAILSYSTEMVM", "VXRAILDISCOVERY"]
-
-        for vdsset in vdssets:
-            vmnic_to_uplink_mapping = {}
-            pg_types_per_vds = []
-            for pg in vdsset["portgroups"]:
-                if pg["type"] in pg_types:
-                    if pg['type'] == 'VXRAILSYSTEMVM' and dvpg_is_on:
-                        pg_types_per_vds.append("VM_MANAGEMENT")
-                    else:
-                        pg_types_per_vds.append(pg["type"])
-            for nic_map in vdsset["nic_mappings"]:
-                for vmnic_to_uplink in nic_map["uplinks"]:
-                    vmnic_to_uplink_mapping[vmnic_to_uplink["physical_nic"].lower()] = vmnic_to_uplink["name"]
-            pgtypes_to_vmnicuplink_mapping[json.dumps(pg_types_per_vds)] = vmnic_to_uplink_mapping
-        return pgtypes_to_vmnicuplink_mapping
+        return list(vds.vmnics)
 
     def get_portgroup_to_active_uplinks(self, dvpg_is_on):
         if self.vxrail_config['version'] == "7.0.202":
             return None
-        else:
-            vdssets = self.__get_attr_value(self.vxrail_config, ["network", "vds"])
-            pg_type_to_active_uplinks = {}
-            pg_types = ["MANAGEMENT", "VSAN", "VMOTION", "VXRAILSYSTEMVM", "VXRAILDISCOVERY"]
-            for vdsset in vdssets:
-                for portgroup in vdsset["portgroups"]:
-                    if portgroup["type"] in pg_types:
-                        active_uplinks = []
-                        for activeUplink in portgroup["failover_order"]["active"]:
-                            active_uplinks.append(activeUplink)
-                        # Adding standby uplink as active, in backend we will make it standby
-                        for standbyUplink in portgroup["failover_order"]["standby"]:
-                            active_uplinks.append(standbyUplink)
-                        if len(active_uplinks) != 2:
-                            print("\033[91m Please provide exact 2 uplinks for active/active or active/standby failover"
-                                  " order for portgroups in VxRail Json Input\033[00m")
-                            exit(1)
-                        if portgroup["type"] == "VXRAILSYSTEMVM" and dvpg_is_on:
-                            pg_type_to_active_uplinks["VM_MANAGEMENT"] = active_uplinks
-                        else:
-                            pg_type_to_active_uplinks[portgroup['type']] = active_uplinks
+        pg_type_to_active_uplinks = {}
+        for pg_type, active_uplinks in self.vds_index.pg_uplinks:
+            if len(active_uplinks) != 2:
+                print("\033[91m Please provide exact 2 uplinks for active/active or active/standby failover"
+                      " order for portgroups in VxRail Json Input\033[00m")
+                exit(1)
+            if pg_type == "VXRAILSYSTEMVM" and dvpg_is_on:
+                pg_type_to_active_uplinks["VM_MANAGEMENT"] = list(active_uplinks)
+            else:
+                pg_type_to_active_uplinks[pg_type] = list(active_uplinks)
         return pg_type_to_active_uplinks
 
     def __get_ip_pools(self, net_type):
-        hosts = self.__get_attr_value(self.vxrail_config, ["hosts"])
+        hosts = self.config_fields['hosts']
         pool = []
         if hosts is None:
-            self.__log_error("Cannot find hosts field in VxRail JSON")
+            self.__log_error(HOSTS_MISSING, "Cannot find hosts field in VxRail JSON", "hosts")
             return pool
-        for h in hosts:
+        json_path = self.json_path
+        for i, h in enumerate(hosts):
+            self.json_path = "hosts[{}].network".format(i)
             tip = ""
             for nw in h["network"]:
                 if nw["type"] == net_type:
                     tip = nw["ip"]
             pool.append(tip)
-        ipstart, ipend = self.__get_ip_range(pool)
+        self.json_path = json_path
+        ipstart, ipend = ip_range_bounds(pool)
+        runs = ip_runs(pool)
+        if len(runs) > 1:
+            # Only the first few runs are listed, hundreds of hosts spread over the subnet make as many runs
+            ranges = ", ".join(int_to_ip(start) if start == end else "{}-{}".format(int_to_ip(start), int_to_ip(end))
+                               for start, end in runs[:5])
+            self.diagnostics.warning(IP_POOL_NOT_CONTIGUOUS, "{} IPs of the hosts are in {} separate ranges ({}{}), the "
+                                     "IP pool {}-{} also covers the addresses in between"
+                                     .format(net_type, len(runs), ranges, ", ..." if len(runs) > 5 else "", ipstart,
+                                             ipend), "hosts")
         return [{"start": ipstart, "end": ipend}]
 
     def __get_pg_name(self, net_type):
-        vdssets = self.__get_attr_value(self.vxrail_config, ["network", "vds"])
-        for vdsset in vdssets:
-            for pg in vdsset["portgroups"]:
-                if pg["type"] == net_type:
-                    return pg["name"] if "name" in pg and len(pg["name"].strip()) > 0 else None
-        return None
+        return self.vds_index.get_pg_name(net_type)
+
+    # Path and value of the external vCenter hostname or IP
+    def __get_vcenter_address(self):
+        if self.vxrail_config['version'] == "7.0.202":
+            # Perth
+            return "vcenter.customer_supplied_vc_name_or_ip", self.config_fields['customer_supplied_vc_name_or_ip']
+        return "vcenter.customer_supplied_vc_name", self.config_fields['customer_supplied_vc_name']
 
     def __validate_vcenter_vc_name_or_ip(self, selected_domain_vcenter_fqdn):
-        if self.__get_attr_value(self.vxrail_config, ["vcenter", "customer_supplied"]):
-            if self.vxrail_config['version'] == "7.0.202":
-                # Perth
-                address = self.__get_attr_value(self.vxrail_config, ["vcenter", "customer_supplied_vc_name_or_ip"])
-            else:
-                address = self.__get_attr_value(self.vxrail_config, ["vcenter", "customer_supplied_vc_name"])
+        if self.config_fields['customer_supplied']:
+            address_path, address = self.__get_vcenter_address()
             if address is None:
-                self.__log_error("vCenter hostname or IP not specified")
+                self.__log_error(VCENTER_ADDRESS_MISSING, "vCenter hostname or IP not specified", address_path)
             else:
-                if self.__is_address_a_ip(address):
-                    fqdn = self.__parse_fqdn_from_ip(address)
+                if is_ipv4(address):
+                    fqdn = self.__parse_fqdn_from_ip(address, address_path)
                 else:
                     fqdn = address
                 if fqdn not in selected_domain_vcenter_fqdn:
-                    self.__log_error("vCenter IP/FQDN provided in json does not match with the selected domain vCenter")
+                    self.__log_error(VCENTER_DOMAIN_MISMATCH, "vCenter IP/FQDN provided in json does not match with"
+                                                              " the selected domain vCenter", address_path)
 
     def __convert_vcenter_spec(self, existing_vcenters_fqdn):
         self.vcenter_spec = {"vmSize": "medium", "storageSize": "lstorage"}
         # only handles for external vc
-        if self.__get_attr_value(self.vxrail_config, ["vcenter", "customer_supplied"]):
-            if self.vxrail_config['version'] == "7.0.202":
-                # Perth
-                address = self.__get_attr_value(self.vxrail_config, ["vcenter", "customer_supplied_vc_name_or_ip"])
-            else:
-                address = self.__get_attr_value(self.vxrail_config, ["vcenter", "customer_supplied_vc_name"])
+        if self.config_fields['customer_supplied']:
+            address_path, address = self.__get_vcenter_address()
             if address is None:
-                self.__log_error("vCenter hostname or IP not specified")
+                self.__log_error(VCENTER_ADDRESS_MISSING, "vCenter hostname or IP not specified", address_path)
             else:
                 # needs to check whether it is ok to count on the dns configured on sddc manager
-                if self.__is_address_a_ip(address):
-                    fqdn = self.__parse_fqdn_from_ip(address)
+                if is_ipv4(address):
+                    fqdn = self.__parse_fqdn_from_ip(address, address_path)
                     if fqdn is None:
-                        self.__log_error("vCenter FQDN is not resolved successfully from ip {}".format(address))
+                        self.__log_error(DNS_FQDN_NOT_RESOLVED, "vCenter FQDN is not resolved successfully from ip"
+                                                                " {}".format(address), address_path)
                 else:
-                    topdomain = self.__get_attr_value(self.vxrail_config, ["global", "top_level_domain"])
+                    topdomain = self.config_fields['top_level_domain']
                     if not address.endswith(topdomain):
-                        self.__log_error("vCenter FQDN {} is not valid for an external address".format(address))
+                        self.__log_error(VCENTER_FQDN_INVALID, "vCenter FQDN {} is not valid for an external address"
+                                         .format(address), address_path)
                     fqdn = address
-                    address = self.__parse_ip_from_fqdn(address)
+                    address = self.__parse_ip_from_fqdn(address, address_path)
                     if address is None:
-                        self.__log_error("vCenter IP is not resolved successfully from FQDN {}".format(fqdn))
+                        self.__log_error(DNS_IP_NOT_RESOLVED, "vCenter IP is not resolved successfully from FQDN {}"
+                                         .format(fqdn), address_path)
                 if fqdn in existing_vcenters_fqdn:
-                    self.__log_error("Input vCenter with FQDN {} already exists as part of different domain. Please"
-                                     " pass new vCenter IP/hostname for Create Domain".format(fqdn))
+                    self.__log_error(VCENTER_ALREADY_EXISTS, "Input vCenter with FQDN {} already exists as part of"
+                                                             " different domain. Please pass new vCenter IP/hostname"
+                                                             " for Create Domain".format(fqdn), address_path)
                 self.vcenter_spec["name"] = fqdn.split(".")[0].lower()
                 self.vcenter_spec["networkDetailsSpec"] = {
                     "ipAddress": address,
                     "dnsName": fqdn
                 }
                 self.vcenter_spec["rootPassword"] = ""  # needs to check where this come from
-                datacenter_name = self.__get_attr_value(self.vxrail_config, ["vcenter", "datacenter_name"])
-                if self.__valid_resource_name(datacenter_name, "Datacenter Name"):
+                datacenter_name = self.config_fields['datacenter_name']
+                if self.__valid_resource_name(datacenter_name, "Datacenter Name", "vcenter.datacenter_name"):
                     self.vcenter_spec["datacenterName"] = datacenter_name
         else:
-            self.__log_error("Target vCenter is not external one")
+            self.__log_error(VCENTER_NOT_EXTERNAL, "Target vCenter is not external one", "vcenter.customer_supplied")
 
     def __convert_host_spec(self):
         self.host_spec = []
-        topdomain = self.__get_attr_value(self.vxrail_config, ["global", "top_level_domain"])
-        errors = []
-        if len(self.__get_attr_value(self.vxrail_config, ["hosts"])) < 3:
-            errors.append("Please pass 3-node cluster config scenario from VxRail Json input. We are not"
-                          " supporting 2-node FC scenarios")
-        for h in self.__get_attr_value(self.vxrail_config, ["hosts"]):
+        topdomain = self.config_fields['top_level_domain']
+        hosts = self.config_fields['hosts']
+        if len(hosts) < 3:
+            self.__log_error(HOST_COUNT_UNSUPPORTED, "Please pass 3-node cluster config scenario from VxRail Json"
+                                                     " input. We are not supporting 2-node FC scenarios", "hosts")
+        # Resolve every host FQDN and management IP together up front instead of one host at a time
+        host_fqdns = ["{}.{}".format(h["hostname"], topdomain) for h in hosts]
+        mgmt_ips = [nw["ip"] for h in hosts for nw in h["network"] if nw["type"] == "MANAGEMENT"]
+        fqdn_to_ip, ip_to_fqdn = self.utils.dns.resolve_many(host_fqdns, mgmt_ips)
+        for i, (h, host_fqdn) in enumerate(zip(hosts, host_fqdns)):
+            self.json_path = "hosts[{}]".format(i)
             hostonespec = {}
-            hostonespec["hostName"] = "{}.{}".format(h["hostname"], topdomain)
-            rec, res = self.__local_run_command("nslookup {}".format(hostonespec["hostName"]))
-            if rec > 0:
-                errors.append("Cannot resolve the hostname {} with the provided DNS server".format(hostonespec["hostName"]))
+            hostonespec["hostName"] = host_fqdn
+            ipaddress = fqdn_to_ip.get(host_fqdn)
+            if ipaddress is None:
+                self.__log_error(DNS_IP_NOT_RESOLVED, "Cannot resolve the hostname {} with the provided DNS server"
+                                 .format(host_fqdn), "hosts[{}].hostname".format(i))
             else:
-                ipaddress = self.__parse_ip_from_fqdn(hostonespec["hostName"])
                 for nw in h["network"]:
                     if nw["type"] == "MANAGEMENT":
                         if ipaddress == nw["ip"]:
                             hostonespec["ipAddress"] = nw["ip"]
                             break
                         else:
-                            errors.append("Input host IP address {} is not in [{}] that resolved from host name {}"
-                                          .format(nw["ip"], ipaddress, hostonespec["hostName"]))
+                            error = "Input host IP address {} is not in [{}] that resolved from host name {}" \
+                                .format(nw["ip"], ipaddress, host_fqdn)
+                            if ip_to_fqdn.get(nw["ip"]):
+                                error += " (IP address {} resolves to {})".format(nw["ip"], ip_to_fqdn[nw["ip"]])
+                            self.__log_error(HOST_IP_MISMATCH, error, "hosts[{}].network".format(i))
             hostonespec["username"] = "root"
-            hostonespec["password"] = self.__get_attr_value(h, ["accounts", "root", "password"])
+            hostonespec["password"] = HOST_ROOT_PASSWORD.get(h)
             hostonespec["sshThumbprint"] = ""
             hostonespec["serialNumber"] = h["host_psnt"]
             self.host_spec.append(hostonespec)
-        if errors:
-            self.__log_error(errors)
 
     def __collect_pg_names(self):
         self.vds_pg_map = {
@@ -398,158 +379,65 @@ class VxRailJsonConverter:
             "VM_MANAGEMENT":self.__get_pg_name("VM_MANAGEMENT")
         }
 
-    # This will compare the vxrail first run json with sample json
-    def compare_input_json_data_pass_through(self, vxrail_mapping):
-        file_loc = None
+    # PassthroughDiff comparing the vxrail first run json with the sample json of the VxRail version, None if
+    # data passthrough is off or there is no sample json
+    def __get_passthrough_diff(self):
+        try:
+            passthrough_config = load_passthrough_config()
+        except (yaml.YAMLError, ValueError):
+            self.utils.printRed("Error parsing yaml file " + PROPERTIES_FILE)
+            exit(1)
+        if passthrough_config is None or not passthrough_config.data_passthrough:
+            return None
+        # version -> sample json path index of data_passthrough_properties.yaml
+        version_index = passthrough_config.sample_json_index
+        # Sample json of the closest lower (or same) VxRail version from yaml file
+        # e.g. For vxrail version >=7.0.400 and <7.0.450, it will pick 7.0.400 sample json.
+        file_loc = version_index.floor(self.vxrm_version)
+        if file_loc is None:
+            # Older than every sample json, the oldest one is the closest schema
+            file_loc = version_index.lowest()
+            if file_loc:
+                self.diagnostics.warning(SAMPLE_JSON_FALLBACK, "No sample JSON for VxRail version {}, new attributes"
+                                                               " are found against {}"
+                                         .format(self.vxrm_version, os.path.basename(file_loc)))
+
+        if not file_loc:
+            return None
+        try:
+            return PassthroughDiff(load_sample_json_index(file_loc))
+        except (OSError, ValueError):
+            self.utils.printRed("Error reading sample json file " + file_loc)
+            exit(1)
 
-        # Searching for sample json from yaml file based on VxRail version
-        for value in vxrail_mapping:
-            if self.vxrm_version == value['version']:
-                file_loc = value['path']
-                break
+    def __add_new_attributes(self, new_attributes):
+        for context, key, entry in new_attributes:
+            if context not in self.vxm_payload:
+                self.vxm_payload[context] = {}
+            if context == CONTEXT_WITH_KEY_VALUE_PAIR:
+                self.vxm_payload[context][key] = entry
+            elif key not in self.vxm_payload[context]:
+                self.vxm_payload[context][key] = [entry]
+            else:
+                self.vxm_payload[context][key].append(entry)
 
-        if file_loc is None:
-            version_to_sample_json_dict = {}
-            for vxrail_map in vxrail_mapping:
-                version_to_sample_json_dict[int(vxrail_map['version'].replace(".", ""))] = vxrail_map['path']
-
-            # Getting VxRail versions from yaml and sort it
-            version_list = list(version_to_sample_json_dict.keys())
-            version_list.sort()
-
-            vxrm_version = self.vxrm_version
-            vxrail_version = int(vxrm_version.replace(".", ""))
-            min_version = 0
-            # We are looping on sorted versions list, finding closest min version
-            # e.g. For vxrail version >=7.0.400 and <7.0.450, it will pick 7.0.400 sample json.
-            for version in version_list:
-                max_version = version
-                if min_version:
-                    if vxrail_version in range(min_version, max_version):
-                        break
-                min_version = max_version
-            file_loc = version_to_sample_json_dict.get(min_version)
-
-        if file_loc:
-            with open(file_loc) as fp:
-                json_spec = json.load(fp)
-            sample_json = json_spec  # old
-            input_json = self.vxrail_config  # new
-            self.prepare_vxrm_context_with_key_value_pair(sample_json, input_json, '')
-
-    def prepare_vxrm_context_with_key_value_pair(self, sample_json, input_json, key):
-        # 4th argument existing_fr_simple_attributes passed as None as it's non-array.
-        # 5th argument scalar passed as False as not scalar.
-        cur_diff_list = self.find_vxrail_json_new_attributes(sample_json, input_json, key, None, False)
-        if cur_diff_list:
-            if "contextWithKeyValuePair" not in self.vxm_payload:
-                self.vxm_payload["contextWithKeyValuePair"] = {}
-            self.vxm_payload["contextWithKeyValuePair"][key] = cur_diff_list
-
-    def prepare_vxrm_context_with_key_value_pair_scalar(self, sample_json, input_json, key,
-                                                        existing_fr_simple_attributes):
-        # 4th argument existing_fr_simple_attributes passed as it's array and requires for unique
-        # identification of array elements.
-        # 5th argument scalar passed as True as it's scalar.
-        cur_diff_list = self.find_vxrail_json_new_attributes(sample_json, input_json, key,
-                                                             existing_fr_simple_attributes, True)
-        if cur_diff_list:
-            dict2 = {'arrayAssociationContext': {'arrayAttributeIdsKeyValue': existing_fr_simple_attributes},
-                     'simpleAttributes': cur_diff_list}
-            if dict2:
-                if "arrayContextWithKeyValuePair" not in self.vxm_payload:
-                    self.vxm_payload["arrayContextWithKeyValuePair"] = {}
-                if key not in self.vxm_payload["arrayContextWithKeyValuePair"]:
-                    self.vxm_payload["arrayContextWithKeyValuePair"][key] = [dict2]
-                else:
-                    self.vxm_payload["arrayContextWithKeyValuePair"][key].append(dict2)
-
-    """
-        This is a recursive function to find difference between two dictionaries.
-        It finds out the properties which are there in input_json(json provided by user) but not in sample_json
-        (sample json for a particular vxrail version).
-        It checks the properties recursively.
-        prev_key stores the hierarchy of the property which is there in input_json but not sample_json
-        Ex. vcenter.accounts implies new property found at input_json["vcenter"]["accounts"]
-    """
-    def find_vxrail_json_new_attributes(self, sample_json, input_json, prev_key, existing_fr_simple_attributes, scalar):
-        cur_diff_list = []
-        for k in input_json.keys():
-            cur_key = k if prev_key == '' else prev_key + '.' + k
-            dtype = self.find_dtype(input_json[k])
-            if k not in sample_json.keys():
-                if dtype == 'DICTIONARY':
-                    # if existing_fr_simple_attributes exists then it's dict inside array, so calling
-                    # scalar function otherwise calling non-scalar
-                    if existing_fr_simple_attributes:
-                        self.prepare_vxrm_context_with_key_value_pair_scalar({}, input_json[k], cur_key,
-                                                                             existing_fr_simple_attributes)
-                    else:
-                        self.prepare_vxrm_context_with_key_value_pair({}, input_json[k], cur_key)
-                elif dtype not in ['UNSUPPORTED', 'LIST']:
-                    cur_diff_list.append({'attributeName': k, 'value': input_json[k], 'datatype': dtype})
-            elif dtype == 'DICTIONARY':
-                # if existing_fr_simple_attributes exists then it's dict inside array, so calling
-                # scalar function otherwise calling non-scalar
-                if existing_fr_simple_attributes:
-                    self.prepare_vxrm_context_with_key_value_pair_scalar(sample_json[k], input_json[k], cur_key,
-                                                                         existing_fr_simple_attributes)
-                else:
-                    self.prepare_vxrm_context_with_key_value_pair(sample_json[k], input_json[k], cur_key)
-            elif dtype == 'LIST' and scalar is False:
-                # Arrays inside array is currently not supporting as it may require some work.
-                # From VxRail Json, for each key-values first hierarchy of array is only supported.
-                self.prepare_payload_for_scalar(input_json[k], sample_json[k], cur_key)
-        return cur_diff_list
-
-    def prepare_payload_for_scalar(self, input_json, sample_json, key):
-        # Iterate through list
-        for element in input_json:
-            existing_fr_simple_attributes = {}
-            if self.find_dtype(element) == 'DICTIONARY':
-                for (elementKey, elementValue) in element.items():
-                    dtype = self.find_dtype(elementValue)
-                    # Preparing existing_fr_simple_attributes by adding simple attributes for each array element which
-                    # already exists in sample json to identify new object/attribute to add on which array element.
-                    if dtype in ['BOOLEAN', 'INTEGER', 'STRING'] and elementKey in sample_json[0].keys():
-                        existing_fr_simple_attributes[elementKey] = elementValue
-                self.prepare_vxrm_context_with_key_value_pair_scalar(sample_json[0], element, key,
-                                                                     existing_fr_simple_attributes)
-
-    def find_dtype(self, x):
-        dtype = 'UNSUPPORTED'
-        if isinstance(x, bool):
-            dtype = "BOOLEAN"
-        elif isinstance(x, int):
-            dtype = "INTEGER"
-        elif isinstance(x, str):
-            dtype = "STRING"
-        elif isinstance(x, dict):
-            dtype = "DICTIONARY"
-        elif isinstance(x, list):
-            dtype = "LIST"
-        return dtype
-
-    def __convert_vxm_payload(self, selected_domain_id, dvpg_is_on):
+    def __convert_vxm_payload(self, dvpg_is_on):
         self.vxm_payload = {
             "rootCredentials": {
                 "credentialType": "SSH",
                 "username": "root",
-                "password": self.__get_attr_value(self.vxrail_config,
-                                                  ["vxrail_manager", "accounts", "root", "password"])
+                "password": self.config_fields['vxm_root_password']
             },
             "adminCredentials": {
                 "credentialType": "SSH",
-                "username": self.__get_attr_value(self.vxrail_config,
-                                                  ["vxrail_manager", "accounts", "service", "username"]),
-                "password": self.__get_attr_value(self.vxrail_config,
-                                                  ["vxrail_manager", "accounts", "service", "password"])
+                "username": self.config_fields['vxm_service_username'],
+                "password": self.config_fields['vxm_service_password']
             },
             "networks": [],
-            "dnsName": "{}.{}".format(self.__get_attr_value(self.vxrail_config, ["vxrail_manager", "name"]),
-                                      self.__get_attr_value(self.vxrail_config, ["global", "top_level_domain"])),
-            "ipAddress": self.__get_attr_value(self.vxrail_config, ["vxrail_manager", "ip"]),
-            "nicProfile": self.__get_attr_value(self.vxrail_config, ["network", "nic_profile"]),
+            "dnsName": "{}.{}".format(self.config_fields['vxm_name'],
+                                      self.config_fields['top_level_domain']),
+            "ipAddress": self.config_fields['vxm_ip'],
+            "nicProfile": self.config_fields['nic_profile'],
             "sslThumbprint": "",  # leave it as empty
             "sshThumbprint": ""  # leave it as empty
         }
@@ -558,9 +446,8 @@ class VxRailJsonConverter:
             "type": "VMOTION",
             "vlanId": self.__get_vlan("VMOTION"),
             "ipPools": self.__get_ip_pools("VMOTION"),
-            "mask": self.__get_attr_value(self.vxrail_config, ["global", "cluster_vmotion_netmask"])
+            "mask": self.config_fields['cluster_vmotion_netmask']
         }
-        self.get_vxrm_version(selected_domain_id)
         self.is_mtu_supported = self.utils.is_mtu_supported(self.vxrm_version)
         pg_to_mtu = None
         if self.is_mtu_supported:
@@ -570,24 +457,13 @@ class VxRailJsonConverter:
 
         self.vxm_payload["networks"].append(vmotion_network)
 
-        properties_file = "data_passthrough_properties.yaml"
-        if os.path.exists(properties_file):
-            with open(properties_file) as f:
-                try:
-                    properties = yaml.load(f, Loader = SafeLoader)
-                    if properties is not None:
-                        if "data_passthrough" in properties:
-                            if properties["data_passthrough"]:
-                                self.compare_input_json_data_pass_through(properties['vxrail_versions'])
-                except yaml.YAMLError as e:
-                    self.utils.printRed("Error parsing yaml file " + properties_file)
-                    exit(1)
-
-        cluster_type = self.__get_attr_value(self.vxrail_config, ["global", "cluster_type"])
+        self.__add_new_attributes(self.passthrough_attributes)
+
+        cluster_type = self.config_fields['cluster_type']
         vsan_vlan = self.__get_vlan("VSAN")
         vm_management_vlan = self.__get_vlan("VXRAILSYSTEMVM")
         vsan_network_present = False
-        for h in self.__get_attr_value(self.vxrail_config, ["hosts"]):
+        for h in self.config_fields['hosts']:
             for nw in h["network"]:
                 if nw["type"] == "VSAN":
                     vsan_network_present = True
@@ -596,7 +472,7 @@ class VxRailJsonConverter:
                 "type": "VSAN",
                 "vlanId": self.__get_vlan("VSAN"),
                 "ipPools": self.__get_ip_pools("VSAN"),
-                "mask": self.__get_attr_value(self.vxrail_config, ["global", "cluster_vsan_netmask"])
+                "mask": self.config_fields['cluster_vsan_netmask']
             }
             if self.is_mtu_supported:
                 if pg_to_mtu and ("VSAN" in pg_to_mtu):
@@ -610,18 +486,18 @@ class VxRailJsonConverter:
         mgmt_network = {
             "type": "MANAGEMENT",
             "vlanId": self.__get_vlan("MANAGEMENT"),
-            "mask": self.__get_attr_value(self.vxrail_config, ["global", "cluster_management_netmask"]),
-            "gateway": self.__get_attr_value(self.vxrail_config, ["global", "cluster_management_gateway"])
+            "mask": self.config_fields['cluster_management_netmask'],
+            "gateway": self.config_fields['cluster_management_gateway']
         }
         if self.is_mtu_supported:
             if pg_to_mtu and ("MANAGEMENT" in pg_to_mtu):
                 mgmt_network["mtu"] = pg_to_mtu["MANAGEMENT"]
-        vm_netmask = self.__get_attr_value(self.vxrail_config, ["global", "cluster_systemvm_netmask"])
-        vm_gateway = self.__get_attr_value(self.vxrail_config, ["global", "cluster_systemvm_gateway"])
+        vm_netmask = self.config_fields['cluster_systemvm_netmask']
+        vm_gateway = self.config_fields['cluster_systemvm_gateway']
         if dvpg_is_on and vm_management_vlan != -1:
             if vm_management_vlan != self.__get_vlan("MANAGEMENT") and (vm_netmask is None or vm_gateway is None):
-                self.__log_error("VM_Management VLAN is different from Management VLAN but VM mask and/or gateway"
-                                 "is not specified")
+                self.__log_error(NETWORK_INVALID, "VM_Management VLAN is different from Management VLAN but VM mask"
+                                                  " and/or gateway is not specified", "global")
             elif vm_netmask and vm_gateway:
                 vm_management_network = {
                     "type": "VM_MANAGEMENT",
@@ -634,45 +510,34 @@ class VxRailJsonConverter:
                                                                                  vm_management_network["mask"]),
                                                                                 strict=False))
                 except Exception as e:
-                    self.__log_error("Please check provided VM_MANAGEMENT gateway and VM_MANAGEMENT are valid")
+                    self.__log_error(NETWORK_INVALID, "Please check provided VM_MANAGEMENT gateway and VM_MANAGEMENT"
+                                                      " are valid", "global.cluster_systemvm_gateway")
 
                 self.vxm_payload["networks"].append(vm_management_network)
             elif not (vm_netmask is None and vm_gateway is None):
-                self.__log_error("Either VM mask or gateway has not been specified for VM_Management")
+                self.__log_error(NETWORK_INVALID, "Either VM mask or gateway has not been specified for VM_Management",
+                                 "global")
         try:
             mgmt_network["subnet"] = str(ipaddress.IPv4Network((mgmt_network["gateway"], mgmt_network["mask"]), strict=False))
         except Exception as e:
-            self.__log_error("Please check provided management gateway and netmask are valid")
+            self.__log_error(NETWORK_INVALID, "Please check provided management gateway and netmask are valid",
+                             "global.cluster_management_gateway")
         self.vxm_payload["networks"].append(mgmt_network)
 
     # Find VxRail Manager version for selected domain
     def get_vxrm_version(self, selected_domain_id):
-        domain_id = None
-        default_cluster_id = None
-
         if selected_domain_id is not None:
             domain_id = selected_domain_id
         else:
-            domains_url = 'https://' + self.hostname + '/v1/domains'
-            domains = self.utils.get_request(domains_url)
-            for domain in domains['elements']:
-                if domain['type'] == MANAGMENT:
-                    domain_id = domain['id']
-
-        get_cluster_url = 'http://' + self.hostname + '/inventory/clusters'
-        header = {'Content-Type': 'application/json'}
-        response = requests.get(get_cluster_url, headers=header, verify=False)
-        if response.status_code == 200:
-            data = json.loads(response.text)
-            for cluster in data:
-                if cluster['domainId'] == domain_id and cluster['isDefault']:
-                    default_cluster_id = cluster['id']
-        else:
-            self.utils.printRed("Error executing API: {}, status code: {}".format(url, response.status_code))
+            domain_id = self.utils.inventory.get_management_domain_id()
+
+        default_cluster = self.utils.inventory.get_default_cluster(domain_id)
+        if default_cluster is None:
+            self.utils.printRed("Default cluster not found in domain {}. Please check isDefault field in "
+                                "inventory for clusters exists in selected domain".format(domain_id))
             exit(1)
 
-        vxrm_url = 'https://' + self.hostname + '/v1/vxrail-managers?domainId=' + domain_id + '&clusterId=' + default_cluster_id
-        vxrm_details = self.utils.get_request(vxrm_url)
+        vxrm_details = self.utils.inventory.get_vxrail_managers(domain_id, default_cluster['id'])
         for vxrm in vxrm_details['elements']:
             self.vxrm_version = vxrm['version'].split("-")[0]
 
@@ -9,12 +9,15 @@
 from vxrailDetails.vxrailjsonconverter import VxRailJsonConverter
 from utils.utils import Utils
 from vxrailDetails.vxrailauthautomator import VxRailAuthAutomator
-from hosts.hostsautomator import HostsAutomator, HostDiscovery
+from hosts.hostsautomator import HostsAutomator
 from network.networkautomator import NetworkAutomator
 import json
 
 __author__ = 'Hong.Yuan'
 
+# transportType of a portgroup spec -> portgroup type of the VxRail JSON, when they differ
+PORTGROUP_TYPES = {'SYSTEMVM': 'VXRAILSYSTEMVM', 'HOSTDISCOVERY': 'VXRAILDISCOVERY'}
+
 
 class VxRailJsonConverterPatch:
     def __init__(self, args):
@@ -31,12 +34,12 @@ class VxRailJsonConverterPatch:
     def __update_thumbprints_for_hosts(self, host_spec, discovered_hosts):
         primary_node_serial_no = self.host_automator.get_primary_node_serialno(discovered_hosts)
         input_hosts_serial_no = []
-        serialno_to_thumbprint = self.host_automator.get_serialno_to_thumbprint_mapping(discovered_hosts)
         notfound_hosts = []
         for h in host_spec:
             input_hosts_serial_no.append(h["serialNumber"])
-            if h["serialNumber"] in serialno_to_thumbprint:
-                h["sshThumbprint"] = serialno_to_thumbprint[h["serialNumber"]]
+            discovered_host = discovered_hosts.get(h["serialNumber"])
+            if discovered_host is not None:
+                h["sshThumbprint"] = discovered_host.ssh_thumbprint
             else:
                 notfound_hosts.append(h["serialNumber"])
 
@@ -81,7 +84,7 @@ class VxRailJsonConverterPatch:
         vds_pg_map = self.converter.get_pg_name_map()
         is_mtu_supported = self.converter.get_is_mtu_supported()
 
-        self.vxrail_auth_automator.check_reachability(vxm_spec["dnsName"])
+        self.vxrail_auth_automator.check_reachability(vxm_spec["dnsName"], [h["hostName"] for h in hosts_spec])
 
         if is_primary:
             vcenter_spec = self.converter.get_vcenter_spec()
@@ -109,8 +112,7 @@ class VxRailJsonConverterPatch:
         vxrm_fqdn = vxm_spec["dnsName"]
         self.utils.printGreen("Getting ssl thumbprint for the passed VxRail Manager {}".format(vxrm_fqdn))
         print(*self.two_line_separator, sep='\n')
-        vxrm_ssl_thumbprint = self.vxrail_auth_automator.get_ssl_thumbprint(vxrm_fqdn)
-        vxrm_ssh_thumbprint = self.vxrail_auth_automator.get_ssh_thumbprint(vxrm_fqdn)
+        vxrm_ssl_thumbprint, vxrm_ssh_thumbprint = self.vxrail_auth_automator.get_thumbprints(vxrm_fqdn)
         self.utils.printGreen("Fetched ssl thumbprint: {}".format(vxrm_ssl_thumbprint))
         self.utils.printGreen("Fetched ssh thumbprint: {}".format(vxrm_ssh_thumbprint))
         vxm_spec["sslThumbprint"] = vxrm_ssl_thumbprint
@@ -141,12 +143,11 @@ class VxRailJsonConverterPatch:
             vm_spec_exists = False
             # Set vds_mtu if it is Single System DVS
             vds_mtu = None
-            pg_types_to_vmnics = pgtypes_to_vmnicuplink_mapping = pg_type_to_active_uplinks = pg_types_to_mtu = None
+            vds_topology = pg_type_to_active_uplinks = None
             if selected_nic_profile == 'ADVANCED_VXRAIL_SUPPLIED_VDS':
-                pg_types_to_vmnics, pg_types_to_mtu = self.converter.get_vmnics_mapped_to_system_dvs(dvpg_is_on, is_mtu_supported)
+                vds_topology = self.converter.get_vds_topology(dvpg_is_on, is_mtu_supported)
                 pg_type_to_active_uplinks = self.converter.get_portgroup_to_active_uplinks(dvpg_is_on)
-                pgtypes_to_vmnicuplink_mapping = self.converter.get_vmnic_to_uplink_mapping_for_vdss(dvpg_is_on)
-                if pg_types_to_mtu and len(pg_types_to_mtu) == 1:
+                if vds_topology.mtu_count() == 1:
                     vds_mtu = self.converter.get_single_system_dvs_mtu()
             else:
                 if is_mtu_supported:
@@ -161,42 +162,44 @@ class VxRailJsonConverterPatch:
                 vm_management_pg = vds_pg_map["VM_MANAGEMENT"]
 
             self.vds_payload, vmnics = self.network_automator.prepare_dvs_info(
-                self.host_automator.get_physical_nics(discovered_hosts), selected_nic_profile,
-                vds_pg_map["MANAGEMENT"], vds_pg_map["VSAN"], vds_pg_map["VMOTION"], pg_types_to_vmnics,
-                pg_type_to_active_uplinks, self.get_cluster_name(), vsan_storage, vm_management_pg, dvpg_is_on, pg_types_to_mtu, vds_mtu, is_mtu_supported=is_mtu_supported)
+                self.host_automator.get_physical_nics(discovered_hosts, [h['serialNumber'] for h in hosts_spec]),
+                selected_nic_profile,
+                vds_pg_map["MANAGEMENT"], vds_pg_map["VSAN"], vds_pg_map["VMOTION"], vds_topology,
+                pg_type_to_active_uplinks, self.get_cluster_name(), vsan_storage, vm_management_pg, dvpg_is_on, vds_mtu, is_mtu_supported=is_mtu_supported)
 
             if vmnics:
                 for host_spec in hosts_spec:
                     host_spec['hostNetworkSpec'] = {'vmNics': vmnics}
-            if pg_types_to_vmnics and pgtypes_to_vmnicuplink_mapping is not None:
+            if vds_topology:
+                # Portgroup types of a system dvs -> system vdss of the VxRail JSON having them. VSAN is left out
+                # for a COMPUTE cluster as the VSAN PG passed in the VxRail JSON is not created
+                system_vdss_by_pg_types = {}
+                for system_vds in vds_topology:
+                    pg_type_set = system_vds.pg_type_set if vsan_storage else system_vds.pg_type_set - {"VSAN"}
+                    system_vdss_by_pg_types.setdefault(pg_type_set, []).append(system_vds)
                 vmnics_list = []
                 for vds in self.vds_payload:
                     if "portGroupSpecs" in vds:
-                        portgroup_types = []
-                        for pg in vds['portGroupSpecs']:
-                            if pg['transportType'] == 'SYSTEMVM':
-                                portgroup_types.append('VXRAILSYSTEMVM')
-                            elif pg['transportType'] == 'HOSTDISCOVERY':
-                                portgroup_types.append('VXRAILDISCOVERY')
-                            else:
-                                portgroup_types.append(pg['transportType'])
-                        for (key, value) in pg_types_to_vmnics.items():
-                            key_list = json.loads(key)
-                            # Remove VSAN PG if it is passed from VxRail JSON Input in case of COMPUTE cluster
-                            if not vsan_storage and "VSAN" in key_list:
-                                key_list.remove("VSAN")
-                            if set(key_list) == set(portgroup_types):
-                                vmnics_list = vmnics_list + self.create_vmnics_spec_for_system_dvs_advanced_profile(
-                                    value, vds['name'], pgtypes_to_vmnicuplink_mapping[key])
+                        portgroup_types = frozenset(PORTGROUP_TYPES.get(pg['transportType'], pg['transportType'])
+                                                    for pg in vds['portGroupSpecs'])
+                        for system_vds in system_vdss_by_pg_types.get(portgroup_types, []):
+                            vmnics_list.extend(self.create_vmnics_spec_for_system_dvs_advanced_profile(
+                                system_vds.vmnics, vds['name'], system_vds.vmnic_to_uplink))
+                # Every host gets the same vmnics, the list is built once and shared by the host specs
+                if vmnics:
+                    # Append to the overlay vmnics in case of Multi dvs
+                    host_vmnics = list(vmnics)
+                    seen = set(tuple(sorted(i.items())) for i in host_vmnics)
+                    for i in vmnics_list:
+                        key = tuple(sorted(i.items()))
+                        if key not in seen:
+                            seen.add(key)
+                            host_vmnics.append(i)
+                else:
+                    # Create New in case of single dvs
+                    host_vmnics = vmnics_list
                 for host_spec in hosts_spec:
-                    if 'hostNetworkSpec' in host_spec and 'vmNics' in host_spec['hostNetworkSpec']:
-                        # Append to existing in case of Multi dvs
-                        for i in vmnics_list:
-                            if i not in host_spec['hostNetworkSpec']['vmNics']:
-                                host_spec['hostNetworkSpec']['vmNics'].append(i)
-                    else:
-                        # Create New in case of single dvs
-                        host_spec['hostNetworkSpec'] = {'vmNics': vmnics_list}
+                    host_spec['hostNetworkSpec'] = {'vmNics': host_vmnics}
 
             print(*self.two_line_separator, sep='\n')
 
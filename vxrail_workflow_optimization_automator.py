@@ -2,13 +2,13 @@
 # Copyright 2021 VMware, Inc.  All rights reserved. -- VMware Confidential
 # Description: Add Domain/Add Cluster using Workflow Optimization
 
+import argparse
 import copy
 import getpass
 import ipaddress
 import json
-import time
-import requests
 from utils.utils import Utils
+from utils.concurrency import run_concurrently
 from nsxt.nsxtautomator import NsxtAutomator
 from network.networkautomator import NetworkAutomator
 from license.licenseautomator import LicenseAutomator
@@ -16,6 +16,7 @@ from hosts.hostsautomator import HostsAutomator
 from vxrailDetails.vxrailauthautomator import VxRailAuthAutomator
 from vxrailDetails.vxrailjsonconverter import VxRailJsonConverter
 from vxrailDetails.vxrailjsonconverterpatch import VxRailJsonConverterPatch
+from vxrailDetails.vxrailjsonbatchconverter import VxRailJsonBatchConverter
 
 __author__ = 'virtis'
 
@@ -39,12 +40,16 @@ class VxRailWorkflowOptimizationAutomator:
         self.converter = VxRailJsonConverter(args)
         self.converter_patch = VxRailJsonConverterPatch(args)
         self.hostname = args[0]
+        self.args = args
         self.two_line_separator = ['', '']
 
     def run(self):
         try:
             print(*self.two_line_separator, sep='\n')
-            self.check_sddc_manager_version()
+            common_errors, create_domain_errors = self.run_preflight_checks()
+            if common_errors:
+                self.print_preflight_errors(common_errors)
+                exit(1)
             self.utils.printCyan("Please choose one of the below option:")
             self.utils.printBold("1) Create Domain")
             self.utils.printBold("2) Add Cluster")
@@ -52,20 +57,68 @@ class VxRailWorkflowOptimizationAutomator:
                                                         self.utils.valid_option, ["1", "2"])
             print(*self.two_line_separator, sep='\n')
 
-            if self.check_lock_acquired_by_workflows():
-                self.utils.printRed("Deployment lock is already acquired by other workflow. "
-                                    "Please wait for it's completion.")
-                exit(1)
             if workflow_selection == "1":
-                self.allow_operations(None)
-                product_type_to_version = self.get_compliance_matrix()
-                self.check_wld_images(product_type_to_version)
+                if create_domain_errors:
+                    self.print_preflight_errors(create_domain_errors)
+                    exit(1)
                 self.create_domain_workflow()
             elif workflow_selection == "2":
                 self.add_cluster_workflow()
             print()
         except KeyboardInterrupt:
             print()
+        finally:
+            self.utils.print_session_stats()
+
+    # Converts every VxRail JSON of batch_path (directory or manifest) without prompting, see VxRailJsonBatchConverter
+    def run_batch(self, batch_path, output_dir, domain_name=None, workers=None):
+        try:
+            print(*self.two_line_separator, sep='\n')
+            vcf_ft_value, vxrail_ft_value, dvpg_ft_value = self.get_subscription_feature_toggle()
+            dvpg_is_on = True if dvpg_ft_value == 'true' else False
+            report = VxRailJsonBatchConverter(self.args, workers).run(batch_path, output_dir, domain_name, dvpg_is_on)
+            if any(r['errors'] for r in report):
+                exit(1)
+        except KeyboardInterrupt:
+            print()
+        finally:
+            self.utils.print_session_stats()
+
+    # Version, lock and Create Domain checks are independent reads, so they are issued together and
+    # every failure is collected instead of exiting on the first one. Create Domain specific failures
+    # are only reported once that workflow is chosen.
+    def run_preflight_checks(self):
+        self.utils.printGreen("Running pre-flight checks...")
+        common_checks = {
+            'SDDC Manager version': self.check_sddc_manager_version,
+            'Deployment lock': self.check_deployment_lock
+        }
+        create_domain_checks = {
+            'Create Domain operation': lambda: self.get_operation_errors(None),
+            'Workload domain images': self.check_wld_images
+        }
+        calls = dict(common_checks)
+        calls.update(create_domain_checks)
+        results = run_concurrently(calls)
+        print(*self.two_line_separator, sep='\n')
+
+        common_errors = []
+        create_domain_errors = []
+        for name, (errors, exception) in results.items():
+            target = common_errors if name in common_checks else create_domain_errors
+            if isinstance(exception, SystemExit):
+                # Utils already printed why it exited
+                target.append("{} check could not be completed".format(name))
+            elif exception is not None:
+                target.append("{} check could not be completed: {}".format(name, exception))
+            elif errors:
+                target.extend(errors)
+        return common_errors, create_domain_errors
+
+    def print_preflight_errors(self, errors):
+        self.utils.printRed("Pre-flight checks failed:")
+        for error in errors:
+            self.utils.printRed(error)
 
     def check_sddc_manager_version(self):
         url = 'https://' + self.hostname + '/v1/sddc-managers'
@@ -75,16 +128,15 @@ class VxRailWorkflowOptimizationAutomator:
             sddc_ver = domain['version'].split("-")[0]
         for req_ver in REQ_VCF_VER:
             if sddc_ver is not None and sddc_ver.startswith(req_ver):
-                return
-        print('\033[91m Fetched VCF version is {} which is not matching with required version {}'.format(sddc_ver,
-                                                                                                         REQ_VCF_VER))
-        print('\033[91m Please make sure the VCF version should be {}'.format(REQ_VCF_VER))
-        exit(1)
+                return []
+        return ['Fetched VCF version is {} which is not matching with required version {}'.format(sddc_ver,
+                                                                                                 REQ_VCF_VER),
+                'Please make sure the VCF version should be {}'.format(REQ_VCF_VER)]
 
     def check_vcf_bom(self, domainId):
         url = 'http://' + self.hostname + '/domainmanager/vxrail/clusters/allowed-operations/' + domainId
         header = {'Content-Type': 'application/json'}
-        response = requests.get(url, headers=header, verify=False)
+        response = self.utils.http.get(url, headers=header)
         if response.status_code != 200:
             self.utils.printRed("Error executing API: {}, status code: {}".format(url, response.status_code))
             exit(1)
@@ -96,6 +148,14 @@ class VxRailWorkflowOptimizationAutomator:
         return wfo_supported
 
     def allow_operations(self, domain_id):
+        errors = self.get_operation_errors(domain_id)
+        if errors:
+            for error in errors:
+                self.utils.printRed(error)
+            exit(1)
+        return True
+
+    def get_operation_errors(self, domain_id):
         if domain_id is None:
             # Create Domain operation
             licensing_info_url = 'https://' + self.hostname + '/v1/resource-functionalities?resourceType=SYSTEM'
@@ -111,14 +171,12 @@ class VxRailWorkflowOptimizationAutomator:
         for resourceFunc in response['elements'][0]['functionalities']:
             if resourceFunc['type'] == operation_to_check:
                 if resourceFunc['isAllowed'] is False:
-                    self.utils.printRed('{} operation is not allowed. Error: {}'.format(
-                        operation_to_check, resourceFunc['errorMessage']))
-                    exit(1)
+                    return ['{} operation is not allowed. Error: {}'.format(operation_to_check,
+                                                                          resourceFunc['errorMessage'])]
                 is_allowed = True
         if is_allowed is None:
-            self.utils.printRed('Resource functionality not found for type {}'.format(operation_to_check))
-            exit(1)
-        return is_allowed
+            return ['Resource functionality not found for type {}'.format(operation_to_check)]
+        return []
 
     def check_is_subscription_active_mode(self, domain_id,vcf_ft_value,vxrail_ft_value):
         if vcf_ft_value == 'true' and vxrail_ft_value == 'true':
@@ -130,7 +188,7 @@ class VxRailWorkflowOptimizationAutomator:
     def get_subscription_feature_toggle(self):
         url = 'http://' + self.hostname + '/domainmanager/features/list'
         header = {'Content-Type': 'application/json'}
-        response = requests.get(url, headers=header, verify=False)
+        response = self.utils.http.get(url, headers=header)
         vcf_ft_value = vxrail_ft_value = None
         if response.status_code == 200:
             data = json.loads(response.text)
@@ -193,7 +251,7 @@ class VxRailWorkflowOptimizationAutomator:
     def check_lock_acquired_by_workflows(self):
         url = 'http://' + self.hostname + '/locks'
         header = {'Content-Type': 'application/json'}
-        response = requests.get(url, headers=header, verify=False)
+        response = self.utils.http.get(url, headers=header)
         if response.status_code == 200:
             data = json.loads(response.text)
             if len(data) > 0:
@@ -205,10 +263,15 @@ class VxRailWorkflowOptimizationAutomator:
             exit(1)
         return False
 
+    def check_deployment_lock(self):
+        if self.check_lock_acquired_by_workflows():
+            return ["Deployment lock is already acquired by other workflow. Please wait for it's completion."]
+        return []
+
     def get_compliance_matrix(self):
         url = 'http://' + self.hostname + '/lcm/compliance/matrix?domainType=VI'
         header = {'Content-Type': 'application/json'}
-        response = requests.get(url, headers=header, verify=False)
+        response = self.utils.http.get(url, headers=header)
         if response.status_code == 200:
             data = json.loads(response.text)
             product_type_to_version = {}
@@ -222,70 +285,59 @@ class VxRailWorkflowOptimizationAutomator:
             exit(1)
         return product_type_to_version
 
-    def check_wld_images(self, product_type_to_version):
-        image = True
+    def check_wld_images(self):
+        product_type_to_version = self.get_compliance_matrix()
+        header = {'Content-Type': 'application/json'}
+        image_calls = {}
         for type, version in product_type_to_version.items():
             url = 'http://' + self.hostname + '/lcm/images?productType={}&imageType=INSTALL&version={}' \
                 .format(type, version)
-            header = {'Content-Type': 'application/json'}
-            response = requests.get(url, headers=header, verify=False)
-            if response.status_code == 200:
+            image_calls[url] = lambda url=url: self.utils.http.get(url, headers=header)
+
+        errors = []
+        image = True
+        for url, (response, exception) in run_concurrently(image_calls).items():
+            if exception is not None:
+                errors.append("Error executing API: {}, {}".format(url, exception))
+            elif response.status_code == 200:
                 data = json.loads(response.text)
                 if len(data) <= 0:
                     image = False
-                    break
             else:
-                self.utils.printRed("Error executing API: {}, status code: {}".format(url, response.status_code))
-                exit(1)
+                errors.append("Error executing API: {}, status code: {}".format(url, response.status_code))
         if not image:
-            self.utils.printRed("Please check vCenter/NSX-Manager images for Add VI operation. Make sure they are "
-                                "compliant with correct BOM versions")
-            exit(1)
+            errors.append("Please check vCenter/NSX-Manager images for Add VI operation. Make sure they are "
+                          "compliant with correct BOM versions")
+        return errors
 
     def get_management_network_details(self, domain_id):
         mgmt_network_obj = {}
-        default_cluster_id = None
         # Finding default cluster in management domain
-        get_cluster_url = 'http://' + self.hostname + '/inventory/clusters'
-        header = {'Content-Type': 'application/json'}
-        response = requests.get(get_cluster_url, headers=header, verify=False)
-        if response.status_code == 200:
-            data = json.loads(response.text)
-            for cluster in data:
-                if cluster['domainId'] == domain_id and cluster['isDefault']:
-                    default_cluster_id = cluster['id']
-                    get_vdses_url = 'https://' + self.hostname + '/v1/clusters/' + cluster['id'] + '/vdses'
-                    vds_details = self.utils.get_request(get_vdses_url)
-                    mgmt_vlan_id = None
-                    for vds in vds_details:
-                        for port_group in vds['portGroups']:
-                            if port_group['transportType'] == 'MANAGEMENT':
-                                mgmt_vlan_id = port_group['vlanId']
-                                break
-                        if mgmt_vlan_id:
-                            break
-                    mgmt_network_obj['vlanId'] = mgmt_vlan_id
-            if default_cluster_id is None:
-                self.utils.printRed("Default cluster not found in domain {}. Please check isDefault field in "
-                                    "inventory for clusters exists in selected domain".format(domain_id))
-                exit(1)
+        default_cluster = self.utils.inventory.get_default_cluster(domain_id)
+        if default_cluster is None:
+            self.utils.printRed("Default cluster not found in domain {}. Please check isDefault field in "
+                                "inventory for clusters exists in selected domain".format(domain_id))
+            exit(1)
+        get_vdses_url = 'https://' + self.hostname + '/v1/clusters/' + default_cluster['id'] + '/vdses'
+        vds_details = self.utils.get_request(get_vdses_url)
+        mgmt_vlan_id = None
+        for vds in vds_details:
+            for port_group in vds['portGroups']:
+                if port_group['transportType'] == 'MANAGEMENT':
+                    mgmt_vlan_id = port_group['vlanId']
+                    break
+            if mgmt_vlan_id:
+                break
+        mgmt_network_obj['vlanId'] = mgmt_vlan_id
 
         # Checking subnet field present for hosts in default cluster
-        url = 'http://' + self.hostname + '/inventory/extensions/vi/esxis'
-        response = requests.get(url, headers=header, verify=False)
-        if response.status_code == 200:
-            data = json.loads(response.text)
-            for host in data:
-                if host['clusterId'] == default_cluster_id:
-                    if 'subnet' in host and 'gateway' in host:
-                        mgmt_network_obj['subnet'] = str(ipaddress.IPv4Network((host['gateway'], host['subnet']),
-                                                                               strict=False))
-                        mgmt_network_obj['gateway'] = host['gateway']
-                        mgmt_network_obj['mask'] = host['subnet']
-                        break
-        else:
-            self.utils.printRed("Error executing API: {}, status code: {}".format(url, response.status_code))
-            exit(1)
+        for host in self.utils.inventory.get_esxis_in_cluster(default_cluster['id']):
+            if 'subnet' in host and 'gateway' in host:
+                mgmt_network_obj['subnet'] = str(ipaddress.IPv4Network((host['gateway'], host['subnet']),
+                                                                       strict=False))
+                mgmt_network_obj['gateway'] = host['gateway']
+                mgmt_network_obj['mask'] = host['subnet']
+                break
         return mgmt_network_obj
 
     def create_domain_workflow(self):
@@ -338,11 +390,7 @@ class VxRailWorkflowOptimizationAutomator:
             vcenter_payload, vxm_payload, hosts_spec, cluster_name, dvs_payload, nsxt_payload, licenses = \
                 self.get_specs_from_vxrail_json(None, True, existing_vcenters_fqdn)
         elif input_selection == "2":
-            domains = self.get_domains()
-            mgmt_domain_id = None
-            for domain in domains['elements']:
-                if domain['type'] == 'MANAGEMENT':
-                    mgmt_domain_id = domain['id']
+            mgmt_domain_id = self.utils.inventory.get_management_domain_id()
             vcenter_payload, gateway, netmask = self.enter_vcenter_inputs_and_prepare_payload(existing_vcenters_fqdn)
             cluster_name, hosts_spec, nsxt_payload, vxm_payload, dvs_payload, licenses = \
                 self.enter_inputs(True, gateway, netmask, mgmt_domain_id)
@@ -427,11 +475,17 @@ class VxRailWorkflowOptimizationAutomator:
         print(*self.two_line_separator, sep='\n')
 
         json_location = input("\033[1m Please enter VxRail JSON location: \033[0m")
-        error_msgs = self.converter.parse(selected_domain_id, json_location, is_primary, existing_vcenters_fqdn, dvpg_is_on)
-        if error_msgs and len(error_msgs) > 0:
-            self.utils.printRed("Find following errors:")
-            for err in error_msgs:
-                self.utils.printRed(err)
+        diagnostics = self.converter.parse(selected_domain_id, json_location, is_primary, existing_vcenters_fqdn,
+                                           dvpg_is_on)
+        if diagnostics:
+            for warning in diagnostics:
+                if not warning.is_error():
+                    self.utils.printYellow(warning.message)
+            if diagnostics.has_errors():
+                self.utils.printRed("Find following errors:")
+                for err in diagnostics:
+                    if err.is_error():
+                        self.utils.printRed(err.message)
                 exit(1)
 
         # If NIC profile FOUR_EXTREME_SPEED is present in input json file and VxRail version starting >= 8,
@@ -519,8 +573,7 @@ class VxRailWorkflowOptimizationAutomator:
 
         self.utils.printGreen("Getting ssl and ssh thumbprint for VxRail Manager {}...".format(vxrm_fqdn))
         print(*self.two_line_separator, sep='\n')
-        vxrm_ssl_thumbprint = self.vxrailmanager.get_ssl_thumbprint(vxrm_fqdn)
-        vxrm_ssh_thumbprint = self.vxrailmanager.get_ssh_thumbprint(vxrm_fqdn)
+        vxrm_ssl_thumbprint, vxrm_ssh_thumbprint = self.vxrailmanager.get_thumbprints(vxrm_fqdn)
         self.utils.printGreen("Fetched ssl thumbprint: {}".format(vxrm_ssl_thumbprint))
         self.utils.printGreen("Fetched ssh thumbprint: {}".format(vxrm_ssh_thumbprint))
 
@@ -553,7 +606,8 @@ class VxRailWorkflowOptimizationAutomator:
             print(*self.two_line_separator, sep='\n')
             # mtu value will be asked only if is_step_by_step is True, so we can take vxrail json as source of input
             dvs_payload, vmnics = self.network.prepare_dvs_info(
-                self.hosts.get_physical_nics(discovered_hosts), selected_nic_profile, vsan_storage=vsan_storage,
+                self.hosts.get_physical_nics(discovered_hosts, [h['serialNumber'] for h in hosts_spec]),
+                selected_nic_profile, vsan_storage=vsan_storage,
                 dvpg_is_on=dvpg_is_on, is_step_by_step=True, is_mtu_supported=is_mtu_supported)
             if vmnics:
                 for host_spec in hosts_spec:
@@ -649,7 +703,6 @@ class VxRailWorkflowOptimizationAutomator:
 
         validate_poll_url = validate_get_url.format(self.hostname, response['id'])
         self.utils.printGreen('Polling on validation api {}'.format(validate_poll_url))
-        time.sleep(10)
         self.utils.printGreen('Validation IN_PROGRESS. It will take some time to complete. Please wait...')
         validation_status = self.utils.poll_on_id(validate_poll_url)
         self.utils.printGreen('Validation ended with status: {}'.format(validation_status))
@@ -702,11 +755,9 @@ class VxRailWorkflowOptimizationAutomator:
         vxm_payload = hosts_spec = cluster_name = dvs_payload = nsxt_payload = licenses = None
         existing_vcenters_fqdn = []
         if input_selection == "1":
-            for domain in domains['elements']:
-                if domain['id'] == selected_domain_id:
-                    # There should only one vc per domain
-                    for vcenter in domain['vcenters']:
-                        existing_vcenters_fqdn.append(vcenter['fqdn'])
+            # There should only one vc per domain
+            for vcenter in self.utils.inventory.get_domain(selected_domain_id)['vcenters']:
+                existing_vcenters_fqdn.append(vcenter['fqdn'])
             vcenter_payload, vxm_payload, hosts_spec, cluster_name, dvs_payload, nsxt_payload, licenses = \
                 self.get_specs_from_vxrail_json(selected_domain_id, False, existing_vcenters_fqdn)
         elif input_selection == "2":
@@ -731,10 +782,8 @@ class VxRailWorkflowOptimizationAutomator:
         exit(1)
 
     def get_domains(self):
-        # get domains
-        domains_url = 'https://' + self.hostname + '/v1/domains'
-        response = self.utils.get_request(domains_url)
-        return response
+        # get domains, fetched once per run
+        return self.utils.inventory.get_domains()
 
     def prepare_payload_for_create_cluster(self, domain_id, cluster_name, hosts_spec,
                                            nsxt_payload, vxm_payload, dvs_payload, licenses,
@@ -747,4 +796,19 @@ class VxRailWorkflowOptimizationAutomator:
 
 
 if __name__ == "__main__":
-    VxRailWorkflowOptimizationAutomator().run()
+    parser = argparse.ArgumentParser(description="Add Domain/Add Cluster using Workflow Optimization")
+    parser.add_argument("--batch", metavar="PATH",
+                        help="Convert every VxRail JSON of a directory or yaml manifest instead of the interactive"
+                             " workflow")
+    parser.add_argument("--domain", metavar="NAME",
+                        help="Batch mode: domain the clusters are added to, Create Domain payloads if omitted")
+    parser.add_argument("--output", metavar="DIR", default="batch_output",
+                        help="Batch mode: directory for the payloads and the report (default: batch_output)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Batch mode: number of worker processes (default: number of CPUs)")
+    cli_args = parser.parse_args()
+    if cli_args.batch:
+        VxRailWorkflowOptimizationAutomator().run_batch(cli_args.batch, cli_args.output, cli_args.domain,
+                                                        cli_args.workers)
+    else:
+        VxRailWorkflowOptimizationAutomator().run()